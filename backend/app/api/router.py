@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.routes import upload, pharmacogenomics, feedback, polypharmacy
+from app.api.routes import upload, pharmacogenomics, feedback, polypharmacy, analysis
 
 api_router = APIRouter()
 
@@ -7,3 +7,4 @@ api_router.include_router(upload.router, prefix="/upload", tags=["Upload"])
 api_router.include_router(pharmacogenomics.router, prefix="/pharmacogenomics", tags=["Pharmacogenomics"])
 api_router.include_router(feedback.router, prefix="/feedback", tags=["Feedback"])
 api_router.include_router(polypharmacy.router, prefix="/polypharmacy", tags=["Polypharmacy"])
+api_router.include_router(analysis.router, tags=["Analysis"])
@@ -1,44 +1,263 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
-from pydantic import BaseModel
+from cachetools import TTLCache
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict
+from python_multipart import MultipartParser
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import parse_options_header
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
 import logging
+import os
+import tempfile
 
 from app.schemas.pharma_schema import PharmaGuardResponse
-from app.services.pipeline.analysis_pipeline import run_analysis_pipeline
-from app.services.llm.explanation_service import EXPLANATION_STORE, is_supported_gene_drug
-from app.services.llm.groq_client import GroqClient
+from app.services.pipeline.analysis_pipeline import (
+    AnalysisCapacityError,
+    run_analysis_pipeline,
+    start_vcf_analysis,
+)
+from app.services.vcf.stream import VcfLineDecoder, VcfLineQueue, iter_vcf_lines
+from app.services.llm.explanation_service import is_supported_gene_drug, wait_for_explanation
+from app.services.llm.groq_client import GroqStreamError, get_groq_client
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Plain form fields are tiny (drug name, patient id); cap them so a bogus
+# client cannot make us buffer an arbitrarily large non-file part.
+MAX_FORM_FIELD_BYTES = 4096
+
+# Whole request body limit: the web client's 5 MB file cap plus headroom for
+# the other form fields and multipart framing.
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(6 * 1024 * 1024)))
+
+# A file sent before 'drug' has no parser to feed yet; like UploadFile, keep
+# it in memory up to this size and spool the rest to disk.
+SPOOL_MAX_MEMORY_BYTES = 1024 * 1024
+
+ANALYZE_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["drug", "vcf"],
+                    "properties": {
+                        "drug": {
+                            "type": "string",
+                            "description": "The name of the drug to analyze (e.g., Clopidogrel)",
+                        },
+                        "vcf": {
+                            "type": "string",
+                            "format": "binary",
+                            "description": "Patient's VCF file containing genetic variants",
+                        },
+                        "patient_id": {
+                            "type": "string",
+                            "default": "anonymous",
+                            "description": "Optional patient identifier",
+                        },
+                    },
+                }
+            }
+        },
+    }
+}
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+async def _stream_analysis_form(
+    request: Request,
+) -> Tuple[Dict[str, str], "asyncio.Future[List[Dict]]"]:
+    """
+    Stream the multipart body straight into the VCF analysis.
+
+    If ``drug`` came before the ``vcf`` part (as the web client sends it), the
+    analysis worker starts when the file begins: bytes are decoded (and
+    gunzipped) as they arrive off the socket and each batch of completed lines
+    is queued to the worker, which parses while the rest of the upload is
+    still arriving. The queue is bounded, so a slow parser slows down reading
+    the body. If ``drug`` comes later, the raw file is spooled (to disk past
+    ``SPOOL_MAX_MEMORY_BYTES``) and analysed once the form is complete.
+    Bodies over ``MAX_UPLOAD_BYTES`` are rejected with 413.
+    Returns the plain form fields and the running analysis.
+    """
+    _, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise _bad_request("Expected a multipart/form-data upload with a 'vcf' file.")
+
+    too_large = HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"Upload exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit.",
+    )
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise too_large
+
+    fields: Dict[str, str] = {}
+    part: Dict[str, object] = {}
+    header_name = bytearray()
+    header_value = bytearray()
+    vcf: Dict[str, object] = {}
+    decoder: Optional[VcfLineDecoder] = None
+    lines = VcfLineQueue()
+    analysis: "Optional[asyncio.Future[List[Dict]]]" = None
+
+    def start_analysis(vcf_lines) -> None:
+        nonlocal analysis
+        drug = fields.get("drug", "").strip()
+        if not drug:
+            raise _bad_request("Missing required form field 'drug'.")
+        analysis = start_vcf_analysis(drug, vcf_lines)
+
+    def on_part_begin() -> None:
+        part.clear()
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_name.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.extend(data[start:end])
+
+    def on_header_end() -> None:
+        if bytes(header_name).lower() == b"content-disposition":
+            _, options = parse_options_header(bytes(header_value))
+            part["name"] = options.get(b"name", b"").decode("utf-8", "replace")
+            if b"filename" in options:
+                part["filename"] = options[b"filename"].decode("utf-8", "replace")
+        header_name.clear()
+        header_value.clear()
+
+    def on_headers_finished() -> None:
+        nonlocal decoder
+        if part.get("name") == "vcf" and "filename" in part:
+            filename = str(part["filename"])
+            if not filename.endswith((".vcf", ".vcf.gz")):
+                raise _bad_request("Invalid file format. Please upload a .vcf or .vcf.gz file.")
+            vcf["gzipped"] = filename.endswith(".gz")
+            if fields.get("drug", "").strip():
+                decoder = VcfLineDecoder(gzipped=vcf["gzipped"])
+                part["decoder"] = decoder
+                start_analysis(lines)
+                analysis.add_done_callback(lambda _: lines.detach())
+            else:
+                vcf["spool"] = part["spool"] = tempfile.SpooledTemporaryFile(
+                    max_size=SPOOL_MAX_MEMORY_BYTES
+                )
+        else:
+            part["data"] = bytearray()
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if "decoder" in part:
+            decoder.feed(data[start:end])
+            return
+        if "spool" in part:
+            part["spool"].write(data[start:end])
+            return
+        buf = part.get("data")
+        if buf is not None:
+            buf.extend(data[start:end])
+            if len(buf) > MAX_FORM_FIELD_BYTES:
+                raise _bad_request(f"Form field '{part.get('name')}' is too large.")
+
+    def on_part_end() -> None:
+        if "data" in part and part.get("name"):
+            fields[str(part["name"])] = part["data"].decode("utf-8", "replace")
+
+    parser = MultipartParser(
+        boundary,
+        callbacks={
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+    received = 0
+    try:
+        try:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > MAX_UPLOAD_BYTES:
+                    raise too_large
+                parser.write(chunk)
+                if decoder is not None:
+                    # Waits while the parser is behind, throttling the upload.
+                    await lines.put(decoder.pop_lines())
+                if analysis is not None and analysis.done():
+                    break  # worker already failed; its error is raised by the caller
+            else:
+                parser.finalize()
+                if decoder is not None:
+                    await lines.put(decoder.close())
+                    await lines.close()
+                elif "spool" in vcf:
+                    spool = vcf["spool"]
+                    spool.seek(0)
+                    start_analysis(iter_vcf_lines(spool, gzipped=vcf["gzipped"]))
+                    analysis.add_done_callback(lambda _: spool.close())
+                else:
+                    raise _bad_request("Missing 'vcf' file in upload.")
+        except FormParserError as e:
+            raise _bad_request(f"Malformed multipart upload: {e}")
+    except BaseException:
+        # Unblock and drop the worker; the upload error is what gets reported.
+        lines.abort()
+        if analysis is not None:
+            analysis.cancel()
+        elif "spool" in vcf:
+            vcf["spool"].close()
+        raise
+
+    return fields, analysis
+
+
 @router.post(
     "/analyze",
     response_model=PharmaGuardResponse,
     status_code=status.HTTP_200_OK,
     summary="Analyze Pharmacogenomic Risk",
-    description="Upload a VCF file and specify a drug to receive a comprehensive pharmacogenomic risk assessment."
+    description="Upload a VCF file and specify a drug to receive a comprehensive pharmacogenomic risk assessment.",
+    openapi_extra=ANALYZE_FORM_SCHEMA,
 )
-async def analyze_pharmacogenomics(
-    drug: str = Form(..., description="The name of the drug to analyze (e.g., Clopidogrel)"),
-    vcf: UploadFile = File(..., description="Patient's VCF file containing genetic variants"),
-    patient_id: str = Form("anonymous", description="Optional patient identifier"),
-) -> PharmaGuardResponse:
+async def analyze_pharmacogenomics(request: Request) -> PharmaGuardResponse:
     """
     Endpoint to trigger the pharmacogenomic analysis pipeline.
-    
+
+    Multipart form fields:
+
     - **drug**: Target drug name
-    - **vcf**: Genetic data file
+    - **vcf**: Genetic data file (.vcf or .vcf.gz), decoded while streaming
     - **patient_id**: Optional identifier
     """
-    if not vcf.filename.endswith(('.vcf', '.vcf.gz')):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file format. Please upload a .vcf or .vcf.gz file."
-        )
-
     try:
-        response = await run_analysis_pipeline(patient_id, drug, vcf)
+        fields, analysis = await _stream_analysis_form(request)
+
+        drug = fields["drug"].strip()
+        patient_id = fields.get("patient_id") or "anonymous"
+
+        response = await run_analysis_pipeline(patient_id, drug, analysis=analysis)
         return response
-        
+
+    except HTTPException:
+        raise
+    except AnalysisCapacityError as ce:
+        logger.warning(f"Rejected analysis request: {str(ce)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(ce)
+        )
     except ValueError as ve:
         logger.error(f"Validation error in pipeline: {str(ve)}")
         raise HTTPException(
@@ -53,15 +272,25 @@ async def analyze_pharmacogenomics(
         )
 
 
-@router.get("/explanation/{job_id}")
+# How long one /explanation request waits for its job before returning null;
+# kept under typical proxy idle timeouts so the client simply re-polls.
+EXPLANATION_POLL_TIMEOUT_SECONDS = 25.0
+
+
+class ExplanationResponse(BaseModel):
+    summary: Optional[str] = None
+
+
+@router.get("/explanation/{job_id}", response_model=ExplanationResponse)
 async def get_explanation(job_id: str):
-    """Poll for async LLM explanation result by job_id."""
-    if job_id in EXPLANATION_STORE:
-        return {"summary": EXPLANATION_STORE[job_id]}
-    return {"summary": None}
+    """Long-poll for async LLM explanation result by job_id (summary is null on timeout)."""
+    summary = await wait_for_explanation(job_id, timeout=EXPLANATION_POLL_TIMEOUT_SECONDS)
+    return {"summary": summary}
 
 
 class AskRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True, str_strip_whitespace=True)
+
     question: str
     gene: str = ""
     diplotype: str = ""
@@ -69,16 +298,14 @@ class AskRequest(BaseModel):
     drug: str = ""
 
 
-@router.post("/ask")
-async def ask_pharmaguard(req: AskRequest):
-    """Clinical AI chatbot — calls LLM directly (no cache) with clinical grounding."""
+class AskResponse(BaseModel):
+    answer: str
 
-    # Gene-drug guardrail
-    gene_note = ""
-    if req.gene and req.drug and not is_supported_gene_drug(req.gene, req.drug):
-        gene_note = "\nNOTE: Gene is not primary metabolism pathway for this drug."
 
-    prompt = f"""SYSTEM:
+GENE_NOT_PRIMARY_NOTE = "\nNOTE: Gene is not primary metabolism pathway for this drug."
+
+# Built once at import; only the patient fields are substituted per request.
+ASK_PROMPT_TEMPLATE = """SYSTEM:
 You are a pharmacogenomics clinical assistant.
 Follow CPIC guidance strictly.
 
@@ -90,27 +317,118 @@ Rules:
 - Maximum 45 words.
 - Clinician tone only.{gene_note}
 
-Gene={req.gene}
-Diplotype={req.diplotype}
-Phenotype={req.phenotype}
-Drug={req.drug}
+Gene={gene}
+Diplotype={diplotype}
+Phenotype={phenotype}
+Drug={drug}
 
-Question: {req.question}
+Question: {question}
 
 Provide concise CPIC-grounded clinical interpretation.
 
 ANSWER:"""
 
+
+# Answers for repeated clinical contexts (same patient data + same question)
+# are served from here instead of calling the LLM again.
+ASK_CACHE: TTLCache = TTLCache(maxsize=5000, ttl=900)
+
+
+def _ask_cache_key(req: AskRequest) -> bytes:
+    """Hash the clinical context + whitespace/case-normalised question."""
+    question = " ".join(req.question.lower().split())
+    raw = "\x1f".join((
+        req.gene.upper(), req.diplotype, req.phenotype, req.drug.upper(), question,
+    ))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+
+ASK_NO_ANSWER = "I'm unable to generate a response right now. Please consult CPIC guidelines or your clinical pharmacist."
+ASK_UNAVAILABLE = "Clinical AI is temporarily unavailable. Please try again."
+
+
+def _sse_frame(payload: Dict[str, str]) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def _ask_event_stream(prompt: Optional[str], cache_key: bytes, cached: Optional[str]) -> AsyncIterator[str]:
+    """
+    SSE frames of {"t": text}; the answer is cached only if the LLM stream
+    completed. A stream that breaks after sending text ends with an
+    {"error": ...} frame instead, so clients can discard the partial answer.
+    """
+    if cached is not None:
+        yield _sse_frame({"t": cached})
+    else:
+        parts: List[str] = []
+        completed = False
+        try:
+            async for token in get_groq_client().generate_chat_stream(prompt):
+                parts.append(token)
+                yield _sse_frame({"t": token})
+            completed = True
+        except GroqStreamError:
+            pass  # already logged by the client
+        except Exception as e:
+            logger.error(f"Ask PharmaGuard stream error: {str(e)}")
+
+        answer = "".join(parts).strip()
+        if completed and answer:
+            ASK_CACHE[cache_key] = answer
+        elif answer:
+            # Cut off mid-answer: flag it rather than cache a partial reply.
+            yield _sse_frame({"error": ASK_UNAVAILABLE})
+        else:
+            # Don't cache the fallback — the next attempt may reach the LLM.
+            yield _sse_frame({"t": ASK_NO_ANSWER})
+    yield "data: [DONE]\n\n"
+
+
+@router.post("/ask", response_model=AskResponse)
+async def ask_pharmaguard(req: AskRequest, stream: bool = False):
+    """
+    Clinical AI chatbot — calls LLM with clinical grounding; repeated contexts hit ASK_CACHE.
+
+    With ``?stream=true`` the answer is sent as server-sent events while the
+    LLM generates it (``data: {"t": "<text>"}`` frames, then ``data: [DONE]``);
+    an ``{"error": ...}`` frame before ``[DONE]`` means the answer was cut off.
+    """
+
+    cache_key = _ask_cache_key(req)
+    cached = ASK_CACHE.get(cache_key)
+    if cached is not None:
+        if stream:
+            return StreamingResponse(_ask_event_stream(None, cache_key, cached), media_type="text/event-stream")
+        return {"answer": cached}
+
+    # Gene-drug guardrail
+    gene_note = ""
+    if req.gene and req.drug and not is_supported_gene_drug(req.gene, req.drug):
+        gene_note = GENE_NOT_PRIMARY_NOTE
+
+    prompt = ASK_PROMPT_TEMPLATE.format_map({
+        "gene_note": gene_note,
+        "gene": req.gene,
+        "diplotype": req.diplotype,
+        "phenotype": req.phenotype,
+        "drug": req.drug,
+        "question": req.question,
+    })
+
+    if stream:
+        return StreamingResponse(_ask_event_stream(prompt, cache_key, None), media_type="text/event-stream")
+
     try:
-        client = GroqClient()
-        answer = await client.generate_chat_text(prompt)
+        answer = await get_groq_client().generate_chat_text(prompt)
 
         if not answer:
-            answer = "I'm unable to generate a response right now. Please consult CPIC guidelines or your clinical pharmacist."
+            # Don't cache the fallback — the next attempt may reach the LLM.
+            return {"answer": ASK_NO_ANSWER}
 
-        return {"answer": answer.strip()}
+        answer = answer.strip()
+        ASK_CACHE[cache_key] = answer
+        return {"answer": answer}
 
     except Exception as e:
         logger.error(f"Ask PharmaGuard error: {str(e)}")
-        return {"answer": "Clinical AI is temporarily unavailable. Please try again."}
-
+        return {"answer": ASK_UNAVAILABLE}
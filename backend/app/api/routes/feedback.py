@@ -1,25 +1,85 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, HTTPException, Depends, FastAPI, Request
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Dict, List, Optional
+import asyncio
 import json
 from pathlib import Path
-from datetime import datetime
-import sys
-sys.path.append(str(Path(__file__).parent.parent.parent))
+import time
 
 from app.services.pharmacogenomics.feedback_learning import (
     BayesianFeedbackLearner,
     LearningPriorsManager,
     FeedbackEvent,
+    LearningPriors,
     load_learning_priors,
     save_learning_priors,
 )
+from app.dependencies import invalidate_polypharmacy_cache
 
 router = APIRouter()
 
 PRIORS_FILE = Path("data/learning_priors.json")
 
+# Priors live in memory (app.state.priors, loaded once on startup); disk
+# writes are coalesced so a burst of feedback produces a single save.
+PRIORS_SAVE_DELAY_SECONDS = 0.5
+PRIORS_MANAGER = LearningPriorsManager(PRIORS_FILE)
+_priors_lock = asyncio.Lock()
+
+# Hyperparameters are fixed, so one learner serves every request.
+LEARNER = BayesianFeedbackLearner(
+    learning_rate=0.1,
+    decay_rate=0.95,
+    min_prior=0.80,
+    max_prior=1.50,
+    max_delta=0.10,
+)
+_pending_save: Optional[asyncio.Task] = None
+
+
+def _publish_priors(app: FastAPI, priors: LearningPriors) -> None:
+    """Make priors current for this process, including the shared risk engine."""
+    app.state.priors = priors
+    risk_engine = getattr(app.state, "risk_engine", None)
+    if risk_engine is not None and risk_engine.enable_feedback_learning:
+        risk_engine.learning_priors = priors
+    # Cached polypharmacy analyses were scored with the old priors
+    invalidate_polypharmacy_cache(app)
+
+
+def load_priors_state(app: FastAPI) -> None:
+    """Read learning priors from disk once, at startup."""
+    _publish_priors(app, PRIORS_MANAGER.load())
+
+
+async def _save_priors_debounced(app: FastAPI) -> None:
+    global _pending_save
+    await asyncio.sleep(PRIORS_SAVE_DELAY_SECONDS)
+    _pending_save = None
+    async with _priors_lock:
+        await asyncio.to_thread(PRIORS_MANAGER.save, app.state.priors)
+
+
+def _schedule_priors_save(app: FastAPI) -> None:
+    global _pending_save
+    if _pending_save is None:
+        _pending_save = asyncio.create_task(_save_priors_debounced(app))
+
+
+async def flush_priors(app: FastAPI) -> None:
+    """Write any pending priors update to disk immediately (used on shutdown)."""
+    global _pending_save
+    if _pending_save is None:
+        return
+    _pending_save.cancel()
+    _pending_save = None
+    async with _priors_lock:
+        await asyncio.to_thread(PRIORS_MANAGER.save, app.state.priors)
+
+
 class FeedbackRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True, str_strip_whitespace=True)
+
     gene: str = Field(..., description="Gene symbol")
     drug: str = Field(..., description="Drug name")
     reported_diplotype: str = Field(..., description="The diplotype originally reported by the system")
@@ -33,7 +93,7 @@ class FeedbackResponse(BaseModel):
     prior_update: Optional[Dict] = Field(None, description="Details of prior update")
 
 @router.post("/", response_model=FeedbackResponse)
-async def submit_feedback(feedback: FeedbackRequest):
+async def submit_feedback(feedback: FeedbackRequest, request: Request):
     """
     Submit clinical feedback to improve the engine using Bayesian learning.
 
@@ -43,57 +103,42 @@ async def submit_feedback(feedback: FeedbackRequest):
     - Confidence-weighted feedback integration
     - Overfitting prevention
     """
-    # Load current learning priors
-    priors_manager = LearningPriorsManager(PRIORS_FILE)
-    current_priors = priors_manager.load()
+    app = request.app
 
     # Create feedback event
     feedback_event = FeedbackEvent(
         gene=feedback.gene,
         reported_diplotype=feedback.reported_diplotype,
         correct_diplotype=feedback.correct_diplotype,
-        timestamp=datetime.now(),
+        timestamp=time.time_ns(),
         feedback_quality=feedback.feedback_quality,
         comments=feedback.comments,
     )
 
-    # Initialize Bayesian learner
-    learner = BayesianFeedbackLearner(
-        learning_rate=0.1,
-        decay_rate=0.95,
-        min_prior=0.80,
-        max_prior=1.50,
-        max_delta=0.10,
-    )
-
-    # Get current prior for this diplotype
-    current_prior = current_priors.get_diplotype_prior(
-        feedback.gene,
-        feedback.correct_diplotype
-    )
+    async with _priors_lock:
+        current_priors = app.state.priors
 
-    # Calculate months since last calibration
-    if current_priors.last_calibration:
-        last_cal = datetime.fromisoformat(current_priors.last_calibration)
-        months_since = feedback_event.months_since(last_cal)
-    else:
-        months_since = 0.0
+        # Get current prior for this diplotype
+        current_prior = current_priors.get_diplotype_prior(
+            feedback.gene,
+            feedback.correct_diplotype
+        )
 
-    # Update prior using Bayesian learning
-    new_prior, explanation = learner.update_prior(
-        current_prior=current_prior,
-        feedback_quality=feedback.feedback_quality,
-        months_since_last_update=months_since,
-    )
+        # Bayesian update (decay + bounded delta) applied incrementally
+        updated_priors = LEARNER.incremental_update(
+            current_priors=current_priors,
+            new_feedback=feedback_event,
+        )
+        new_prior = updated_priors.get_diplotype_prior(
+            feedback.gene,
+            feedback.correct_diplotype
+        )
+        explanation = updated_priors.metadata["last_update_explanation"]
 
-    # Apply incremental update
-    updated_priors = learner.incremental_update(
-        current_priors=current_priors,
-        new_feedback=feedback_event,
-    )
+        # Publish in memory; persisted by the debounced writer
+        _publish_priors(app, updated_priors)
 
-    # Save updated priors
-    priors_manager.save(updated_priors)
+    _schedule_priors_save(app)
 
     return FeedbackResponse(
         status="success",
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException, Query
-from datetime import datetime
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List
 
 from app.services.pharmacogenomics.models import (
@@ -8,7 +9,8 @@ from app.services.pharmacogenomics.models import (
     GenotypeData,
     VariantCall
 )
-from app.services.pharmacogenomics.cpic_loader import get_cpic_loader
+from app.dependencies import get_phenotype_mapper, get_risk_engine
+from app.utils.timestamps import utc_now_iso
 from app.services.pharmacogenomics.phenotype_mapper import PhenotypeMapper
 from app.services.pharmacogenomics.risk_engine import RiskEngine
 
@@ -42,13 +44,13 @@ async def create_pharmacogenomic_report(
     drug: str,
     gene: str,
     variants: List[VariantCall],
-    patient_id: str = "PATIENT_001"
+    patient_id: str = "PATIENT_001",
+    mapper: PhenotypeMapper = Depends(get_phenotype_mapper),
+    engine: RiskEngine = Depends(get_risk_engine),
 ):
     """
     Generate a Pharmacogenomic Risk Report based on provided variants.
     """
-    loader = get_cpic_loader()
-    
     # 1. Process Genotype
     genotype_data = GenotypeData(
         sample_id=patient_id,
@@ -58,12 +60,13 @@ async def create_pharmacogenomic_report(
         coverage_mean=30.0
     )
     
-    mapper = PhenotypeMapper()
-    diplotype_result = mapper.process_genotype(genotype_data)
+    # Genotype resolution and risk scoring are CPU-bound; run them in the
+    # default thread pool so the event loop keeps serving other requests.
+    diplotype_result = await asyncio.to_thread(mapper.process_genotype, genotype_data)
     
     # 2. Evaluate Risk
-    engine = RiskEngine()
-    risk, recommendation = engine.evaluate_risk(
+    risk, recommendation = await asyncio.to_thread(
+        engine.evaluate_risk,
         drug=drug,
         gene=gene,
         phenotype=diplotype_result.phenotype,
@@ -75,7 +78,7 @@ async def create_pharmacogenomic_report(
     return PharmacogenomicReport(
         patient_id=patient_id,
         drug=drug,
-        timestamp=datetime.utcnow().isoformat() + "Z",
+        timestamp=utc_now_iso(),
         risk_assessment=risk,
         pharmacogenomic_profile=PharmacogenomicProfile(
             primary_gene=gene,
@@ -7,24 +7,24 @@ Endpoints:
 - POST /api/polypharmacy/check-pair - Check specific drug pair interaction
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
-from pathlib import Path
-import sys
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
+from pydantic import BaseModel, ConfigDict, Field
+from cachetools import TTLCache
+from functools import lru_cache
+import hashlib
+import json
+from typing import List, Dict, Optional, Tuple
 
-sys.path.append(str(Path(__file__).parent.parent.parent))
-
-from app.services.pharmacogenomics.risk_engine import RiskEngine
 from app.services.pharmacogenomics.multi_drug_risk import (
-    MultiDrugRiskAnalyzer,
     InteractionMatrix,
     get_interaction_database,
     DrugDrugInteraction,
     InteractionType,
     InteractionSeverity,
+    interaction_severity_rank,
 )
-from app.services.pharmacogenomics.models import PatientProfile, DiplotypeResult
+from app.dependencies import get_drug_interaction_matrix, get_polypharmacy_cache, get_risk_engine
+from app.utils.timestamps import utc_now_iso
 
 
 router = APIRouter()
@@ -34,13 +34,25 @@ router = APIRouter()
 # Request/Response Models
 # ============================================================================
 
+class GeneDiplotypeInput(BaseModel):
+    """Per-gene diplotype call supplied by the client."""
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
+    diplotype: str = "Unknown"
+    phenotype: str = "Unknown"
+    confidence: float = Field(0.0, ge=0.0, le=1.0)
+    is_indeterminate: bool = False
+
+
 class PolypharmacyAnalysisRequest(BaseModel):
     """Request for polypharmacy analysis."""
+    model_config = ConfigDict(extra="forbid", frozen=True, str_strip_whitespace=True)
+
     patient_id: str = Field(..., description="Patient identifier")
     drugs: List[str] = Field(..., min_items=2, description="List of drugs to analyze (minimum 2)")
 
     # Patient pharmacogenomic profile
-    diplotypes: Dict[str, Dict] = Field(
+    diplotypes: Dict[str, GeneDiplotypeInput] = Field(
         ...,
         description="Patient diplotypes by gene (gene -> {diplotype, phenotype, confidence})"
     )
@@ -79,6 +91,27 @@ class DrugRiskSummary(BaseModel):
     recommendation: str
 
 
+def _interaction_info(interaction: DrugDrugInteraction) -> DrugInteractionInfo:
+    """
+    Response view of a database interaction.
+
+    The source objects are trusted in-process data with the right types, so
+    validation is skipped.
+    """
+    return DrugInteractionInfo.model_construct(
+        drug_a=interaction.drug_a,
+        drug_b=interaction.drug_b,
+        gene=interaction.gene,
+        interaction_type=interaction.interaction_type.value,
+        severity=interaction.severity.value,
+        risk_multiplier=interaction.risk_multiplier,
+        mechanism=interaction.mechanism,
+        clinical_implication=interaction.clinical_implication,
+        monitoring_recommendation=interaction.monitoring_recommendation,
+        affected_phenotypes=interaction.affected_phenotypes,
+    )
+
+
 class PolypharmacyAnalysisResponse(BaseModel):
     """Response for polypharmacy analysis."""
     patient_id: str
@@ -113,6 +146,8 @@ class PolypharmacyAnalysisResponse(BaseModel):
 
 class DrugPairCheckRequest(BaseModel):
     """Request to check specific drug pair interaction."""
+    model_config = ConfigDict(extra="forbid", frozen=True, str_strip_whitespace=True)
+
     drug_a: str
     drug_b: str
     gene: Optional[str] = None
@@ -128,37 +163,72 @@ class DrugPairCheckResponse(BaseModel):
     recommendation: str
 
 
+class InteractionSummaryResponse(BaseModel):
+    """Summary statistics of the interaction database."""
+    total_interactions: int
+    unique_drugs: int
+    genes_covered: List[str]
+    severity_distribution: Dict[str, int]
+    gene_distribution: Dict[str, int]
+    interaction_type_distribution: Dict[str, int]
+
+
+# ============================================================================
+# Analysis Cache
+# ============================================================================
+
+# Analyses are pure in the request body given the startup-loaded engine, so
+# identical requests (e.g. UI re-clicks) are served from the app.state cache
+# (app.dependencies). The feedback route invalidates it whenever learning
+# priors change.
+
+def _polypharmacy_cache_key(request: PolypharmacyAnalysisRequest) -> bytes:
+    """Hash the canonical JSON form of the request body."""
+    raw = json.dumps(request.model_dump(), sort_keys=True)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+
 # ============================================================================
 # Endpoints
 # ============================================================================
 
 @router.post("/analyze", response_model=PolypharmacyAnalysisResponse)
-async def analyze_polypharmacy(request: PolypharmacyAnalysisRequest):
+async def analyze_polypharmacy(
+    request: PolypharmacyAnalysisRequest,
+    risk_engine=Depends(get_risk_engine),
+    cache: TTLCache = Depends(get_polypharmacy_cache),
+):
     """
     Analyze combined pharmacogenomic risk from multiple drugs.
 
     Detects drug-drug-gene interactions, calculates combined risk scores,
-    and provides polypharmacy-specific recommendations.
+    and provides polypharmacy-specific recommendations. Repeated identical
+    requests are answered from the polypharmacy cache (including the original
+    analysis_timestamp).
     """
-    from datetime import datetime
+    from app.services.pharmacogenomics.multi_drug_risk import MultiDrugRiskAnalyzer
+    from app.services.pharmacogenomics.models import PatientProfile, DiplotypeResult
 
-    try:
-        # Initialize risk engine
-        risk_engine = RiskEngine()
+    cache_key = _polypharmacy_cache_key(request)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
 
+    try:
         # Build patient profile from diplotypes
         patient_profile = PatientProfile(
             sample_id=request.patient_id,
             diplotypes={}
         )
 
+        # Inputs were validated (and defaulted) with the request body
         for gene, data in request.diplotypes.items():
-            patient_profile.diplotypes[gene] = DiplotypeResult(
+            patient_profile.diplotypes[gene] = DiplotypeResult.model_construct(
                 gene=gene,
-                diplotype=data.get("diplotype", "Unknown"),
-                phenotype=data.get("phenotype", "Unknown"),
-                confidence=data.get("confidence", 0.0),
-                is_indeterminate=data.get("is_indeterminate", False),
+                diplotype=data.diplotype,
+                phenotype=data.phenotype,
+                confidence=data.confidence,
+                is_indeterminate=data.is_indeterminate,
             )
 
         # Evaluate each drug individually
@@ -177,71 +247,59 @@ async def analyze_polypharmacy(request: PolypharmacyAnalysisRequest):
         analyzer = MultiDrugRiskAnalyzer()
         multi_drug_assessment = analyzer.analyze_multi_drug_risk(drug_assessments)
 
-        # Build individual drug risk summaries
+        # Build individual drug risk summaries and risk contributions in one
+        # pass (individual_risks is the same assessment list)
+        total_score = sum(a.risk.risk_score or 0.0 for a in drug_assessments)
         individual_risks = []
-        for assess in drug_assessments:
-            individual_risks.append(DrugRiskSummary(
+        risk_contributions = []
+        for assess in multi_drug_assessment.individual_risks:
+            risk_score = assess.risk.risk_score or 0.0
+            risk_level = assess.risk.risk_level or assess.risk.severity
+
+            individual_risks.append(DrugRiskSummary.model_construct(
                 drug=assess.drug,
                 gene=assess.gene,
                 diplotype=assess.diplotype,
                 phenotype=assess.phenotype,
-                risk_score=assess.risk.risk_score or 0.0,
-                risk_level=assess.risk.risk_level or assess.risk.severity,
+                risk_score=risk_score,
+                risk_level=risk_level,
                 confidence_score=assess.risk.confidence_score,
                 recommendation=assess.recommendation.text,
             ))
 
-        # Build interaction info
-        interactions_info = []
-        for interaction in multi_drug_assessment.detected_interactions:
-            # Filter by severity if requested
-            if request.interaction_severity_filter:
-                if interaction.severity.value != request.interaction_severity_filter:
-                    continue
-
-            interactions_info.append(DrugInteractionInfo(
-                drug_a=interaction.drug_a,
-                drug_b=interaction.drug_b,
-                gene=interaction.gene,
-                interaction_type=interaction.interaction_type.value,
-                severity=interaction.severity.value,
-                risk_multiplier=interaction.risk_multiplier,
-                mechanism=interaction.mechanism,
-                clinical_implication=interaction.clinical_implication,
-                monitoring_recommendation=interaction.monitoring_recommendation,
-                affected_phenotypes=interaction.affected_phenotypes,
-            ))
-
-        # Build risk contributions
-        risk_contributions = []
-        for contrib in multi_drug_assessment.individual_risks:
             # Calculate contribution percentage
-            total_score = sum(
-                a.risk.risk_score or 0.0
-                for a in drug_assessments
-            )
             contrib_pct = (
-                (contrib.risk.risk_score or 0.0) / total_score * 100
+                risk_score / total_score * 100
                 if total_score > 0 else 0.0
             )
 
             risk_contributions.append({
-                "drug": contrib.drug,
-                "individual_risk_score": contrib.risk.risk_score or 0.0,
+                "drug": assess.drug,
+                "individual_risk_score": risk_score,
                 "contribution_percentage": round(contrib_pct, 1),
-                "risk_level": contrib.risk.risk_level or contrib.risk.severity,
+                "risk_level": risk_level,
             })
 
+        # Build interaction info
+        interactions_info = []
+        for interaction in multi_drug_assessment.detected_interactions:
+            # Filter by severity if requested
+            if request.interaction_severity_filter:
+                if interaction.severity.value != request.interaction_severity_filter:
+                    continue
+
+            interactions_info.append(_interaction_info(interaction))
+
         # Sort by contribution
         risk_contributions.sort(
             key=lambda x: x["contribution_percentage"],
             reverse=True
         )
 
-        return PolypharmacyAnalysisResponse(
+        response = PolypharmacyAnalysisResponse(
             patient_id=request.patient_id,
             drugs_analyzed=multi_drug_assessment.drugs,
-            analysis_timestamp=datetime.now().isoformat(),
+            analysis_timestamp=utc_now_iso(),
             combined_risk_score=multi_drug_assessment.combined_risk_score,
             combined_risk_level=multi_drug_assessment.combined_risk_level,
             combined_confidence=multi_drug_assessment.combined_confidence,
@@ -259,6 +317,8 @@ async def analyze_polypharmacy(request: PolypharmacyAnalysisRequest):
             ),
             risk_contributions=risk_contributions,
         )
+        cache[cache_key] = response
+        return response
 
     except Exception as e:
         raise HTTPException(
@@ -267,11 +327,39 @@ async def analyze_polypharmacy(request: PolypharmacyAnalysisRequest):
         )
 
 
+def precompute_interaction_responses(app: FastAPI) -> None:
+    """Build the unfiltered /interactions payload once, at startup."""
+    app.state.all_interactions = tuple(
+        _interaction_info(interaction)
+        for interaction in app.state.interaction_matrix.interactions
+    )
+
+
+@lru_cache(maxsize=256)
+def _compute_interactions(
+    matrix: InteractionMatrix,
+    gene: Optional[str],
+    severity: Optional[InteractionSeverity],
+    drug: Optional[str],
+) -> Tuple[DrugInteractionInfo, ...]:
+    """
+    Filtered interaction list for one query. The database is static, so
+    results are cached per (matrix, filters); a rebuilt matrix misses.
+    """
+    # Apply filters via the startup-built gene/severity/drug indexes
+    filtered = matrix.filter_interactions(gene=gene, severity=severity, drug=drug)
+
+    # Convert to response model
+    return tuple(_interaction_info(interaction) for interaction in filtered)
+
+
 @router.get("/interactions", response_model=List[DrugInteractionInfo])
 async def get_interactions(
+    request: Request,
     gene: Optional[str] = None,
     severity: Optional[str] = None,
     drug: Optional[str] = None,
+    matrix: InteractionMatrix = Depends(get_drug_interaction_matrix),
 ):
     """
     Get drug-drug-gene interaction database.
@@ -281,65 +369,44 @@ async def get_interactions(
     - severity: Filter by severity (critical/major/moderate/minor)
     - drug: Filter by specific drug
     """
-    interaction_db = get_interaction_database()
-
-    # Apply filters
-    filtered = interaction_db
-
-    if gene:
-        filtered = [i for i in filtered if i.gene == gene]
+    # Unfiltered dashboard load: serve the startup-built payload
+    if gene is None and severity is None and drug is None:
+        return list(request.app.state.all_interactions)
 
+    sev = None
     if severity:
         try:
             sev = InteractionSeverity(severity.lower())
-            filtered = [i for i in filtered if i.severity == sev]
         except ValueError:
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid severity: {severity}. Use critical/major/moderate/minor"
             )
 
-    if drug:
-        drug_lower = drug.lower()
-        filtered = [
-            i for i in filtered
-            if drug_lower in (i.drug_a.lower(), i.drug_b.lower())
-        ]
-
-    # Convert to response model
-    interactions_info = []
-    for interaction in filtered:
-        interactions_info.append(DrugInteractionInfo(
-            drug_a=interaction.drug_a,
-            drug_b=interaction.drug_b,
-            gene=interaction.gene,
-            interaction_type=interaction.interaction_type.value,
-            severity=interaction.severity.value,
-            risk_multiplier=interaction.risk_multiplier,
-            mechanism=interaction.mechanism,
-            clinical_implication=interaction.clinical_implication,
-            monitoring_recommendation=interaction.monitoring_recommendation,
-            affected_phenotypes=interaction.affected_phenotypes,
-        ))
-
-    return interactions_info
+    return list(_compute_interactions(matrix, gene, sev, drug))
 
 
 @router.post("/check-pair", response_model=DrugPairCheckResponse)
-async def check_drug_pair(request: DrugPairCheckRequest):
+async def check_drug_pair(
+    request: DrugPairCheckRequest,
+    matrix: InteractionMatrix = Depends(get_drug_interaction_matrix),
+):
     """
     Check for interaction between a specific drug pair.
 
     Optionally filter by gene and phenotype.
     """
-    matrix = InteractionMatrix(get_interaction_database())
 
-    # Get interactions for this pair
+    # Get interactions for this pair (one dict lookup on the startup index)
     interactions = matrix.get_interactions_for_pair(
         request.drug_a,
         request.drug_b
     )
 
+    # Most pairs have no entry at all; skip filtering and ranking
+    if not interactions:
+        return _no_pair_interaction(request)
+
     # Filter by gene if specified
     if request.gene:
         interactions = [i for i in interactions if i.gene == request.gene]
@@ -352,66 +419,59 @@ async def check_drug_pair(request: DrugPairCheckRequest):
                 request.phenotype in i.affected_phenotypes)
         ]
 
-    has_interaction = len(interactions) > 0
+    if not interactions:
+        return _no_pair_interaction(request)
 
     # Build response
-    interactions_info = []
-    for interaction in interactions:
-        interactions_info.append(DrugInteractionInfo(
-            drug_a=interaction.drug_a,
-            drug_b=interaction.drug_b,
-            gene=interaction.gene,
-            interaction_type=interaction.interaction_type.value,
-            severity=interaction.severity.value,
-            risk_multiplier=interaction.risk_multiplier,
-            mechanism=interaction.mechanism,
-            clinical_implication=interaction.clinical_implication,
-            monitoring_recommendation=interaction.monitoring_recommendation,
-            affected_phenotypes=interaction.affected_phenotypes,
-        ))
+    interactions_info = [_interaction_info(interaction) for interaction in interactions]
 
     # Generate recommendation
-    if has_interaction:
-        highest_severity = max(
-            interactions,
-            key=lambda i: {
-                InteractionSeverity.CRITICAL: 4,
-                InteractionSeverity.MAJOR: 3,
-                InteractionSeverity.MODERATE: 2,
-                InteractionSeverity.MINOR: 1,
-            }.get(i.severity, 0)
-        )
+    highest_severity = max(interactions, key=interaction_severity_rank)
 
-        if highest_severity.severity == InteractionSeverity.CRITICAL:
-            recommendation = (
-                f"AVOID combination: {highest_severity.mechanism}. "
-                f"{highest_severity.monitoring_recommendation}"
-            )
-        elif highest_severity.severity == InteractionSeverity.MAJOR:
-            recommendation = (
-                f"Use with caution: {highest_severity.mechanism}. "
-                f"{highest_severity.monitoring_recommendation}"
-            )
-        else:
-            recommendation = (
-                f"Monitor: {highest_severity.mechanism}. "
-                f"{highest_severity.monitoring_recommendation}"
-            )
+    if highest_severity.severity == InteractionSeverity.CRITICAL:
+        recommendation = (
+            f"AVOID combination: {highest_severity.mechanism}. "
+            f"{highest_severity.monitoring_recommendation}"
+        )
+    elif highest_severity.severity == InteractionSeverity.MAJOR:
+        recommendation = (
+            f"Use with caution: {highest_severity.mechanism}. "
+            f"{highest_severity.monitoring_recommendation}"
+        )
     else:
-        recommendation = "No known pharmacogenomic interaction detected for this drug pair."
+        recommendation = (
+            f"Monitor: {highest_severity.mechanism}. "
+            f"{highest_severity.monitoring_recommendation}"
+        )
 
     return DrugPairCheckResponse(
         drug_a=request.drug_a,
         drug_b=request.drug_b,
-        has_interaction=has_interaction,
+        has_interaction=True,
         interactions=interactions_info,
         recommendation=recommendation,
     )
 
 
-@router.get("/interaction-summary")
+def _no_pair_interaction(request: DrugPairCheckRequest) -> DrugPairCheckResponse:
+    return DrugPairCheckResponse(
+        drug_a=request.drug_a,
+        drug_b=request.drug_b,
+        has_interaction=False,
+        interactions=[],
+        recommendation="No known pharmacogenomic interaction detected for this drug pair.",
+    )
+
+
+@router.get("/interaction-summary", response_model=InteractionSummaryResponse)
 async def get_interaction_summary():
     """Get summary statistics of interaction database."""
+    return _compute_interaction_summary()
+
+
+@lru_cache(maxsize=1)
+def _compute_interaction_summary() -> InteractionSummaryResponse:
+    """Summary of the static interaction database, computed once."""
     interaction_db = get_interaction_database()
 
     # Count by severity
@@ -422,31 +482,25 @@ async def get_interaction_summary():
         "minor": 0,
     }
 
-    for interaction in interaction_db:
-        severity_counts[interaction.severity.value] += 1
-
-    # Count by gene
     gene_counts = {}
-    for interaction in interaction_db:
-        gene_counts[interaction.gene] = gene_counts.get(interaction.gene, 0) + 1
-
-    # Count by interaction type
     type_counts = {}
+    drugs = set()
+
+    # Count by severity, gene and interaction type, and collect unique drugs,
+    # in a single pass
     for interaction in interaction_db:
+        severity_counts[interaction.severity.value] += 1
+        gene_counts[interaction.gene] = gene_counts.get(interaction.gene, 0) + 1
         itype = interaction.interaction_type.value
         type_counts[itype] = type_counts.get(itype, 0) + 1
-
-    # Get unique drugs
-    drugs = set()
-    for interaction in interaction_db:
         drugs.add(interaction.drug_a)
         drugs.add(interaction.drug_b)
 
-    return {
-        "total_interactions": len(interaction_db),
-        "unique_drugs": len(drugs),
-        "genes_covered": list(gene_counts.keys()),
-        "severity_distribution": severity_counts,
-        "gene_distribution": gene_counts,
-        "interaction_type_distribution": type_counts,
-    }
+    return InteractionSummaryResponse(
+        total_interactions=len(interaction_db),
+        unique_drugs=len(drugs),
+        genes_covered=list(gene_counts.keys()),
+        severity_distribution=severity_counts,
+        gene_distribution=gene_counts,
+        interaction_type_distribution=type_counts,
+    )
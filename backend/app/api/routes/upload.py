@@ -1,11 +1,10 @@
+import asyncio
+
 from fastapi import APIRouter, File, UploadFile, HTTPException, Query
 from typing import List, Optional
 
-from app.services.vcf.pharmaguard_adapter import (
-    analyze_vcf_for_drugs, 
-    SUPPORTED_DRUGS_TO_GENE
-)
 from app.services.vcf.parser import VcfParseError
+from app.services.vcf.stream import iter_vcf_lines
 
 router = APIRouter()
 
@@ -20,17 +19,35 @@ async def upload_vcf(
     - **file**: The VCF file containing variant data.
     - **drugs**: Optional list of drug names to filter the report. If omitted, all supported drugs are analyzed.
     """
-    if not (file.filename.endswith(".vcf") or file.filename.endswith(".vcf.gz")):
+    # The adapter drags in the CPIC data and risk engine; import on first use
+    from app.services.vcf.pharmaguard_adapter import (
+        analyze_vcf_for_drugs,
+        SUPPORTED_DRUGS_TO_GENE,
+    )
+
+    filename = file.filename or ""
+    if not (filename.endswith(".vcf") or filename.endswith(".vcf.gz")):
         raise HTTPException(status_code=400, detail="Invalid file format. Please upload .vcf or .vcf.gz")
 
     try:
-        content = await file.read()
+        # Parse straight off the spooled upload, line by line. Branch on
+        # extension: .vcf.gz is magic-checked on the raw bytes and inflated
+        # incrementally; plain .vcf is header-checked on its first line.
+        # Either way bad uploads fail on the first chunk.
+        content = iter_vcf_lines(file.file, gzipped=filename.endswith(".vcf.gz"))
         
-        # Determine target drugs
-        target_drugs = drugs if drugs else list(SUPPORTED_DRUGS_TO_GENE.keys())
+        # Determine target drugs, folded to the upper-case keys of
+        # SUPPORTED_DRUGS_TO_GENE so "codeine" and "Codeine" are one analysis
+        target_drugs = (
+            tuple(dict.fromkeys(d.strip().upper() for d in drugs))
+            if drugs else tuple(SUPPORTED_DRUGS_TO_GENE.keys())
+        )
         
-        # Analyze using the VCF adapter (which now uses the real engine)
-        results = analyze_vcf_for_drugs(content, target_drugs)
+        # Analyze using the VCF adapter (which now uses the real engine).
+        # Parsing, the spooled-file reads behind ``content`` and risk
+        # evaluation are all blocking, so run them on the default executor
+        # instead of stalling every other request on this worker.
+        results = await asyncio.to_thread(analyze_vcf_for_drugs, content, target_drugs)
         
         return results
         
@@ -0,0 +1,53 @@
+"""
+Shared FastAPI dependencies.
+
+The CPIC loader, phenotype mapper, risk engine and drug interaction matrix
+are built once on startup (see app.main) and stored on app.state; these
+helpers hand them to routes. The polypharmacy analysis cache lives there
+too, so routes that invalidate it don't need to import each other.
+"""
+
+from cachetools import TTLCache
+from fastapi import FastAPI, Request
+
+from app.services.pharmacogenomics.cpic_loader import CPICDataLoader
+from app.services.pharmacogenomics.multi_drug_risk import InteractionMatrix
+from app.services.pharmacogenomics.phenotype_mapper import PhenotypeMapper
+from app.services.pharmacogenomics.risk_engine import RiskEngine
+
+
+def get_loader(request: Request) -> CPICDataLoader:
+    """Startup-loaded CPIC data loader."""
+    return request.app.state.cpic_loader
+
+
+def get_phenotype_mapper(request: Request) -> PhenotypeMapper:
+    """Startup-built phenotype mapper (stateless between calls)."""
+    return request.app.state.phenotype_mapper
+
+
+def get_risk_engine(request: Request) -> RiskEngine:
+    """Startup-built risk engine (stateless between calls)."""
+    return request.app.state.risk_engine
+
+
+def get_drug_interaction_matrix(request: Request) -> InteractionMatrix:
+    """Startup-built interaction matrix with pair/gene/severity/drug indexes."""
+    return request.app.state.interaction_matrix
+
+
+def create_polypharmacy_cache() -> TTLCache:
+    """Cache of polypharmacy analyses keyed by request-body hash (startup)."""
+    return TTLCache(maxsize=1024, ttl=600)
+
+
+def get_polypharmacy_cache(request: Request) -> TTLCache:
+    """Startup-created polypharmacy analysis cache."""
+    return request.app.state.polypharmacy_cache
+
+
+def invalidate_polypharmacy_cache(app: FastAPI) -> None:
+    """Drop cached polypharmacy analyses (e.g. after learning priors change)."""
+    cache = getattr(app.state, "polypharmacy_cache", None)
+    if cache is not None:
+        cache.clear()
@@ -1,10 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+from typing import Dict
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.router import api_router
-from app.api.routes import analysis
+from app.api.routes.feedback import load_priors_state, flush_priors
+from app.api.routes.polypharmacy import precompute_interaction_responses
 from app.core import logging  # Initialize logging
+from app.dependencies import create_polypharmacy_cache
 from app.services.pharmacogenomics.cpic_loader import get_cpic_loader
-from app.services.llm.groq_client import GroqClient
+from app.services.pharmacogenomics.multi_drug_risk import get_interaction_matrix
+from app.services.pharmacogenomics.phenotype_mapper import PhenotypeMapper
+from app.services.pharmacogenomics.risk_engine import RiskEngine
+from app.services.pipeline.analysis_pipeline import shutdown_analysis_executor
+from app.services.llm.groq_client import get_groq_client, close_shared_client
 
 app = FastAPI(
     title="PharmaGuard API",
@@ -23,18 +34,48 @@ app.add_middleware(
 
 # Include API Routers
 app.include_router(api_router, prefix="/api/v1")
-app.include_router(analysis.router, prefix="/api/v1", tags=["Analysis"])
 
 @app.on_event("startup")
 async def startup_event():
-    # Preload CPIC data
+    # Size the default executor used by asyncio.to_thread for CPU-bound
+    # genotype/risk work offloaded from request handlers
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+    )
+
+    # CPIC parsing and engine construction are blocking; run them on a worker
+    # thread while the Groq round-trip is in flight so cold start costs
+    # max(load, warmup) rather than their sum
     print("Preloading CPIC data...")
-    get_cpic_loader()
+    engine_state, _ = await asyncio.gather(
+        asyncio.to_thread(_build_engine_state),
+        _warmup_llm(),
+    )
+    (
+        app.state.cpic_loader,
+        app.state.phenotype_mapper,
+        app.state.risk_engine,
+        app.state.interaction_matrix,
+    ) = engine_state
+    app.state.polypharmacy_cache = create_polypharmacy_cache()
+    load_priors_state(app)
+    precompute_interaction_responses(app)
+
+
+def _build_engine_state():
+    """Load CPIC data and build the shared mapper, engine and interaction matrix once."""
+    return (
+        get_cpic_loader(),
+        PhenotypeMapper(),
+        RiskEngine(),
+        get_interaction_matrix(),
+    )
 
-    # Verify Groq connectivity (non-blocking)
+
+async def _warmup_llm():
+    """Verify Groq connectivity; failures only disable LLM explanations."""
     try:
-        client = GroqClient()
-        result = await client.generate_text("Respond with OK.")
+        result = await get_groq_client().generate_text("Respond with OK.")
         if result:
             print("🔥 Groq LLM connected successfully.")
         else:
@@ -42,6 +83,17 @@ async def startup_event():
     except Exception as e:
         print(f"⚠️ Groq not reachable ({e}). LLM explanations will use fallback. Server starting anyway.")
 
-@app.get("/health")
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Persist any debounced feedback priors update
+    await flush_priors(app)
+
+    # Release pooled LLM connections
+    await close_shared_client()
+
+    # Drop streaming analysis workers still waiting on abandoned uploads
+    shutdown_analysis_executor()
+
+@app.get("/health", response_model=Dict[str, str])
 async def health_check():
     return {"status": "ok", "service": "PharmaGuard"}
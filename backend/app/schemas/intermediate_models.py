@@ -1,17 +1,20 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from dataclasses import dataclass
+from pydantic import Field
+from typing import Annotated, List, Optional
 
-class VariantCall(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class VariantCall:
     chrom: str
     pos: int
     rsid: Optional[str] = None
     ref: str
     alt: str
-    zygosity: str = Field(..., description="HET, HOM_REF, or HOM_ALT")
+    zygosity: Annotated[str, Field(description="HET, HOM_REF, or HOM_ALT")]
     quality: float
     filter: Optional[str] = None
 
-class GenotypeData(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class GenotypeData:
     sample_id: str
     gene_symbol: str
     variants: List[VariantCall]
@@ -1,3 +1,4 @@
+from functools import cached_property
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Any
 
@@ -17,3 +18,10 @@ class RiskEngineOutput(BaseModel):
         default=None, 
         description="List of specific variants detected (e.g., rs12345: G>A)"
     )
+
+    @cached_property
+    def variants_str(self) -> str:
+        """Comma-separated variant IDs for prompts ("None" if there are none); built once."""
+        if not self.detected_variants:
+            return "None"
+        return ", ".join(v.get("id", "unknown") for v in self.detected_variants)
@@ -1,9 +1,11 @@
+import asyncio
+import json
 import logging
 import httpx
 import backoff
 import random
 import os
-from typing import Optional
+from typing import AsyncIterator, Optional
 from dotenv import load_dotenv, find_dotenv
 
 # Load .env file (walks up directories to find it)
@@ -16,8 +18,20 @@ GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "")
 GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
 GROQ_MODEL = os.environ.get("GROQ_MODEL", "llama-3.1-8b-instant")
 
-# Shared HTTP client for connection reuse
-_shared_client = httpx.AsyncClient(timeout=30.0)
+# Shared HTTP client for connection reuse (keep-alive pool across requests)
+_shared_client = httpx.AsyncClient(
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=32),
+)
+
+# Caps in-flight Groq calls so a traffic spike queues here instead of
+# tripping the API's rate limits; sized for Groq, overridable per deploy.
+GROQ_MAX_CONCURRENCY = int(os.environ.get("GROQ_MAX_CONCURRENCY", "20"))
+_llm_semaphore = asyncio.Semaphore(GROQ_MAX_CONCURRENCY)
+
+
+class GroqStreamError(Exception):
+    """A streamed Groq response failed or ended before it was complete."""
 
 
 class GroqClient:
@@ -57,7 +71,8 @@ class GroqClient:
         }
 
         try:
-            response = await _shared_client.post(GROQ_API_URL, json=payload, headers=headers)
+            async with _llm_semaphore:
+                response = await _shared_client.post(GROQ_API_URL, json=payload, headers=headers)
             response.raise_for_status()
 
             data = response.json()
@@ -100,7 +115,8 @@ class GroqClient:
         }
 
         try:
-            response = await _shared_client.post(GROQ_API_URL, json=payload, headers=headers)
+            async with _llm_semaphore:
+                response = await _shared_client.post(GROQ_API_URL, json=payload, headers=headers)
             response.raise_for_status()
 
             data = response.json()
@@ -115,3 +131,74 @@ class GroqClient:
         except Exception as e:
             logger.error(f"Unexpected error in Groq chat client: {str(e)}")
             return None
+
+    async def generate_chat_stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Streams chatbot response text from Groq as it is generated.
+
+        Raises GroqStreamError (after logging) if the request fails or the
+        stream stops before ``data: [DONE]`` / a ``finish_reason``, so callers
+        can tell a cut-off answer from a complete one.
+        """
+        logger.info("Sending streaming CHAT request to Groq", extra={"model": self.model})
+
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": 80,
+            "temperature": 0.15,
+            "top_p": 0.85,
+            "seed": random.randint(1, 999999),
+            "stream": True,
+        }
+
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+        completed = False
+        try:
+            async with _llm_semaphore, _shared_client.stream("POST", GROQ_API_URL, json=payload, headers=headers) as response:
+                response.raise_for_status()
+                # OpenAI-compatible SSE: "data: {...}" chunks, ending with "data: [DONE]"
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[len("data: "):]
+                    if data == "[DONE]":
+                        completed = True
+                        break
+                    choice = json.loads(data)["choices"][0]
+                    delta = choice["delta"].get("content")
+                    if delta:
+                        yield delta
+                    if choice.get("finish_reason"):
+                        completed = True
+
+        except (httpx.HTTPStatusError, httpx.RequestError) as e:
+            logger.error(f"Error communicating with Groq (chat stream): {str(e)}")
+            raise GroqStreamError(str(e)) from e
+        except Exception as e:
+            logger.error(f"Unexpected error in Groq chat stream: {str(e)}")
+            raise GroqStreamError(str(e)) from e
+
+        if not completed:
+            logger.error("Groq chat stream closed before completion")
+            raise GroqStreamError("stream closed before completion")
+
+
+_groq_client: Optional[GroqClient] = None
+
+
+def get_groq_client() -> GroqClient:
+    """Get the process-wide GroqClient instance."""
+    global _groq_client
+    if _groq_client is None:
+        _groq_client = GroqClient()
+    return _groq_client
+
+
+async def close_shared_client() -> None:
+    """Close the pooled HTTP connections (call on app shutdown)."""
+    await _shared_client.aclose()
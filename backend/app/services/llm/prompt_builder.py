@@ -1,21 +1,34 @@
+from functools import lru_cache
+
+_PROMPT_TEMPLATE = (
+    "Act as a clinical pharmacogenomics expert. "
+    "Patient data: Gene: {gene}, Diplotype: {diplotype}, Phenotype: {phenotype}, Drug: {drug}. "
+    "Clinical Recommendation: {recommendation}. "
+    "Write a concise 3 sentence clinical pharmacogenomic explanation mentioning enzyme metabolism and drug response."
+)
+
+
+# The same (gene, diplotype, phenotype, drug, recommendation) tuples recur
+# across patients, so repeat prompts are served from the cache.
+@lru_cache(maxsize=8192)
 def build_prompt(gene: str, diplotype: str, phenotype: str, drug: str, recommendation: str) -> str:
     """
     Constructs a prompt for the LLM to generate a clinical explanation.
-    
+
     Args:
         gene: The gene symbol.
         diplotype: The detected diplotype.
         phenotype: The metabolizer status.
         drug: The drug name.
         recommendation: The clinical recommendation text.
-        
+
     Returns:
         A formatted prompt string.
     """
-    prompt = (
-        f"Act as a clinical pharmacogenomics expert. "
-        f"Patient data: Gene: {gene}, Diplotype: {diplotype}, Phenotype: {phenotype}, Drug: {drug}. "
-        f"Clinical Recommendation: {recommendation}. "
-        f"Write a concise 3 sentence clinical pharmacogenomic explanation mentioning enzyme metabolism and drug response."
+    return _PROMPT_TEMPLATE.format(
+        gene=gene,
+        diplotype=diplotype,
+        phenotype=phenotype,
+        drug=drug,
+        recommendation=recommendation,
     )
-    return prompt
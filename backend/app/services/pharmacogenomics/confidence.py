@@ -14,17 +14,69 @@ Rules:
 
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass, field, fields
-from typing import Dict, List, Optional, Sequence
-
-from .config import get_config
+from enum import IntEnum
+from operator import attrgetter
+from typing import AbstractSet, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 
 # ---------------------------------------------------------------------------
 # Confidence Breakdown — every component tracked independently
 # ---------------------------------------------------------------------------
 
-@dataclass
+# Fields the derived axes are computed from; setting any of them drops the
+# memoised values on ConfidenceBreakdown.
+_DERIVED_INPUTS = frozenset({
+    "variant_quality",
+    "allele_coverage",
+    "cnv_evaluation",
+    "genome_build_validity",
+    "diplotype_determinism",
+    "knowledge_confidence",
+    "gene_drug_confirmed",
+})
+
+# Component scores in all_scores() order, read in one C-level call
+_SCORE_FIELDS = (
+    "variant_quality",
+    "allele_coverage",
+    "cnv_evaluation",
+    "genome_build_validity",
+    "diplotype_determinism",
+    "cpic_applicability",
+)
+_ALL_SCORES = attrgetter(*_SCORE_FIELDS)
+
+
+# Genotype confidence weights: allele coverage, CNV, variant quality, build
+_W_ALLELE_COVERAGE = 0.35
+_W_CNV_EVALUATION = 0.25
+_W_VARIANT_QUALITY = 0.25
+_W_GENOME_BUILD = 0.15
+
+
+def _clamp01(x: float) -> float:
+    return max(0.0, min(1.0, x))
+
+
+def _genotype_score(
+    allele_coverage: float,
+    cnv_evaluation: float,
+    variant_quality: float,
+    genome_build_validity: float,
+) -> float:
+    """Weighted genotype confidence clamped to [0, 1] (full precision)."""
+    raw = (
+        _W_ALLELE_COVERAGE * allele_coverage +
+        _W_CNV_EVALUATION * cnv_evaluation +
+        _W_VARIANT_QUALITY * variant_quality +
+        _W_GENOME_BUILD * genome_build_validity
+    )
+    return _clamp01(raw)
+
+
+@dataclass(slots=True)
 class ConfidenceBreakdown:
     """
     Confidence Architecture — two-axis model.
@@ -46,6 +98,9 @@ class ConfidenceBreakdown:
       → "We are confident the result IS inconclusive" ≠ "we know nothing"
 
     Automation requires: resolved phenotype + strong evidence + confirmed pair.
+
+    The derived axes and automation status are computed together on first
+    access and memoised until one of their input fields is assigned.
     """
 
     # --- Genotype components (patient-specific VCF quality) ---
@@ -64,14 +119,78 @@ class ConfidenceBreakdown:
     knowledge_confidence: float = 1.0
 
     # --- Audit fields ---
-    penalties_applied: List[str] = field(default_factory=list)
+    # Entries are plain strings or (code, *args) tuples rendered from
+    # _PENALTY_TEMPLATES by to_dict(), so unread audit text is never formatted.
+    penalties_applied: List[Union[str, tuple]] = field(default_factory=list)
     automation_blocked_reasons: List[str] = field(default_factory=list)
 
     # --- gene-drug confirmation flag ---
     gene_drug_confirmed: bool = True
 
+    # --- memoised (genotype, phenotype, classification, final, blocked_reasons) ---
+    _derived: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        object.__setattr__(self, name, value)
+        if name in _DERIVED_INPUTS:
+            object.__setattr__(self, "_derived", None)
+
     # --------------- derived axes ------------------
 
+    def _compute_derived(self) -> tuple:
+        """
+        Compute every derived axis, the automation gates and the final
+        score in one pass (see the properties below for the formulas).
+
+        Axes are kept at full precision; only ``final`` is rounded here,
+        and to_dict() rounds each emitted value once.
+        """
+        genotype = _genotype_score(
+            self.allele_coverage,
+            self.cnv_evaluation,
+            self.variant_quality,
+            self.genome_build_validity,
+        )
+
+        phenotype = max(0.0, genotype * self.diplotype_determinism)
+
+        knowledge = _clamp01(self.knowledge_confidence)
+        if phenotype > 0.0:
+            # Resolved: confidence tracks phenotype + knowledge
+            raw = 0.6 * phenotype + 0.4 * knowledge
+        else:
+            # Unresolved: we're confident it IS inconclusive
+            raw = 0.6 * (1.0 - phenotype) + 0.4 * knowledge
+        classification = _clamp01(raw)
+
+        reasons = []
+        if phenotype <= 0.0:
+            reasons.append(
+                f"Phenotype unresolved (phenotype_confidence = {phenotype:.2f})"
+            )
+        if self.knowledge_confidence < 0.80:
+            reasons.append(
+                f"Evidence insufficient (knowledge_confidence = {self.knowledge_confidence:.2f}, requires ≥ 0.80)"
+            )
+        if genotype < 0.50:
+            reasons.append(
+                f"Genotype quality too low (genotype_confidence = {genotype:.2f}, requires ≥ 0.50)"
+            )
+        if not self.gene_drug_confirmed:
+            reasons.append(
+                "Gene-drug pair not confirmed in PharmGKB"
+            )
+
+        # Caps: unresolved phenotype → 0.50, blocked automation → 0.70
+        phenotype_cap = 0.50 if phenotype == 0 else 1.0
+        automation_cap = 0.70 if reasons else 1.0
+        # final is the API confidence_score, so it is the one value rounded here
+        final = round(_clamp01(min(classification, phenotype_cap, automation_cap)), 4)
+
+        derived = (genotype, phenotype, classification, final, tuple(reasons))
+        object.__setattr__(self, "_derived", derived)
+        return derived
+
     @property
     def genotype_confidence(self) -> float:
         """
@@ -86,13 +205,7 @@ class ConfidenceBreakdown:
         Unresolved diplotype → components are capped by risk engine,
         ensuring genotype_confidence < 1.0.
         """
-        raw = (
-            0.35 * self.allele_coverage +
-            0.25 * self.cnv_evaluation +
-            0.25 * self.variant_quality +
-            0.15 * self.genome_build_validity
-        )
-        return max(0.0, min(1.0, round(raw, 4)))
+        return (self._derived or self._compute_derived())[0]
 
     @property
     def phenotype_confidence(self) -> float:
@@ -105,9 +218,7 @@ class ConfidenceBreakdown:
         phenotype_confidence = 0 regardless of genotype quality.
         When resolved, phenotype confidence is bounded by genotype quality.
         """
-        return max(0.0, round(
-            self.genotype_confidence * self.diplotype_determinism, 4
-        ))
+        return (self._derived or self._compute_derived())[1]
 
     @property
     def classification_confidence(self) -> float:
@@ -122,17 +233,7 @@ class ConfidenceBreakdown:
           If resolved:   0.6 * phenotype_confidence + 0.4 * knowledge_confidence
           If unresolved: 0.6 * (1 − phenotype_confidence) + 0.4 * knowledge_confidence
         """
-        pheno = self.phenotype_confidence
-        knowledge = max(0.0, min(1.0, self.knowledge_confidence))
-
-        if pheno > 0.0:
-            # Resolved: confidence tracks phenotype + knowledge
-            raw = 0.6 * pheno + 0.4 * knowledge
-        else:
-            # Unresolved: we're confident it IS inconclusive
-            raw = 0.6 * (1.0 - pheno) + 0.4 * knowledge
-
-        return max(0.0, min(1.0, round(raw, 4)))
+        return (self._derived or self._compute_derived())[2]
 
     @property
     def final(self) -> float:
@@ -150,19 +251,7 @@ class ConfidenceBreakdown:
         - Overall confidence cannot be maximal (1.0) when phenotype_confidence = 0
         - Overall confidence cannot be maximal when automation gates fail
         """
-        base_confidence = self.classification_confidence
-
-        # Apply phenotype cap: if phenotype is unresolved, confidence cannot exceed 0.50
-        phenotype_cap = 0.50 if self.phenotype_confidence == 0 else 1.0
-
-        # Apply automation cap: if automation is blocked, confidence cannot exceed 0.70
-        automation_status = self.get_automation_status()
-        automation_cap = 0.70 if not automation_status.get("allowed", True) else 1.0
-
-        # Final confidence = min(base, phenotype_cap, automation_cap)
-        final_confidence = min(base_confidence, phenotype_cap, automation_cap)
-
-        return max(0.0, min(1.0, round(final_confidence, 4)))
+        return (self._derived or self._compute_derived())[3]
 
     def get_automation_status(self) -> Dict[str, object]:
         """
@@ -174,40 +263,15 @@ class ConfidenceBreakdown:
 
         Returns dict with 'allowed' and 'blocked_reasons'.
         """
-        reasons = []
-
-        if self.phenotype_confidence <= 0.0:
-            reasons.append(
-                f"Phenotype unresolved (phenotype_confidence = {self.phenotype_confidence:.2f})"
-            )
-        if self.knowledge_confidence < 0.80:
-            reasons.append(
-                f"Evidence insufficient (knowledge_confidence = {self.knowledge_confidence:.2f}, requires ≥ 0.80)"
-            )
-        if self.genotype_confidence < 0.50:
-            reasons.append(
-                f"Genotype quality too low (genotype_confidence = {self.genotype_confidence:.2f}, requires ≥ 0.50)"
-            )
-        if not self.gene_drug_confirmed:
-            reasons.append(
-                "Gene-drug pair not confirmed in PharmGKB"
-            )
-
+        reasons = (self._derived or self._compute_derived())[4]
         return {
-            "allowed": len(reasons) == 0,
-            "blocked_reasons": reasons,
+            "allowed": not reasons,
+            "blocked_reasons": list(reasons),
         }
 
-    def all_scores(self) -> List[float]:
+    def all_scores(self) -> Tuple[float, ...]:
         """Return all component scores (backward compat)."""
-        return [
-            self.variant_quality,
-            self.allele_coverage,
-            self.cnv_evaluation,
-            self.genome_build_validity,
-            self.diplotype_determinism,
-            self.cpic_applicability,
-        ]
+        return _ALL_SCORES(self)
 
     def to_dict(self) -> Dict[str, object]:
         """
@@ -217,6 +281,9 @@ class ConfidenceBreakdown:
         exclusively on RiskAssessment.automation_status to prevent
         duplication.
         """
+        return self._as_dict(_format_penalty)
+
+    def _as_dict(self, render_penalty) -> Dict[str, object]:
         return {
             # Knowledge (external evidence)
             "knowledge_confidence": round(self.knowledge_confidence, 4),
@@ -233,7 +300,7 @@ class ConfidenceBreakdown:
             # Classification (label correctness)
             "classification_confidence": round(self.classification_confidence, 4),
             # Audit trail
-            "penalties_applied": list(self.penalties_applied),
+            "penalties_applied": [render_penalty(p) for p in self.penalties_applied],
         }
 
 
@@ -241,7 +308,9 @@ class ConfidenceBreakdown:
 # Penalty constants (additive deductions from 1.0 base)
 # ---------------------------------------------------------------------------
 
-# These are *deductions*, not multipliers.
+# These are *deductions*, not multipliers. They are fixed module constants:
+# nothing here reads get_config(), so penalty application never touches the
+# config object (config.ConfidencePenalties are the mapper's multipliers).
 # Variant quality
 PENALTY_FAILED_FILTER = 0.30          # FILTER ≠ PASS
 PENALTY_LOW_QUALITY = 0.15            # QUAL < threshold
@@ -268,9 +337,28 @@ PENALTY_PHENOTYPE_INDETERMINATE = 0.30  # Phenotype could not be determined
 PENALTY_UNKNOWN_GENOME_BUILD = 0.20   # Genome build unknown or missing
 PENALTY_GRCH37_GENOME_BUILD = 0.15    # GRCh37 detected, GRCh38 expected
 
+# Genome build label -> (audit code, penalty), or None for no penalty. Covers
+# the spellings seen in practice; anything else falls back to a
+# case-insensitive "unknown" check in apply_genome_build_penalty.
+_UNKNOWN_BUILD_PENALTY = ("UNKNOWN_GENOME_BUILD", PENALTY_UNKNOWN_GENOME_BUILD)
+_GENOME_BUILD_PENALTY: Dict[Optional[str], Optional[Tuple[str, float]]] = {
+    None: _UNKNOWN_BUILD_PENALTY,
+    "": _UNKNOWN_BUILD_PENALTY,
+    "unknown": _UNKNOWN_BUILD_PENALTY,
+    "Unknown": _UNKNOWN_BUILD_PENALTY,
+    "UNKNOWN": _UNKNOWN_BUILD_PENALTY,
+    "GRCh37": ("GRCH37_GENOME_BUILD", PENALTY_GRCH37_GENOME_BUILD),
+    "hg19": ("GRCH37_GENOME_BUILD", PENALTY_GRCH37_GENOME_BUILD),
+    "GRCh38": None,
+    "hg38": None,
+}
+
 # Genes requiring CNV evaluation
 CNV_REQUIRED_GENES = frozenset({"CYP2D6"})
 
+# Diplotype labels penalised as indeterminate on the legacy (flag-based) path
+_INDETERMINATE_DIPLOTYPES = frozenset({"Indeterminate", "Unknown"})
+
 # ---------------------------------------------------------------------------
 # Diplotype Quality Categories
 # ---------------------------------------------------------------------------
@@ -288,11 +376,161 @@ DIPLOTYPE_QUALITY_PENALTIES: Dict[str, float] = {
     "INDETERMINATE":           0.60,   # Cannot resolve diplotype
 }
 
+
+class DiplotypeQuality(IntEnum):
+    """Diplotype quality categories (names match DIPLOTYPE_QUALITY_PENALTIES)."""
+    EXACT_HOM = 0
+    EXACT_HET_WILDTYPE = 1
+    COMPOUND_HET_PHASED = 2
+    COMPOUND_HET_UNPHASED = 3
+    VCF_ANNOTATION = 4
+    PARTIAL = 5
+    AMBIGUOUS = 6
+    INDETERMINATE = 7
+
+
+# Penalties indexed by DiplotypeQuality value (plain tuple indexing, no hashing)
+_DIPLOTYPE_QUALITY_PENALTY: Tuple[float, ...] = tuple(
+    DIPLOTYPE_QUALITY_PENALTIES[quality.name] for quality in DiplotypeQuality
+)
+
 # Variant quality thresholds
 VARIANT_QUAL_THRESHOLD = 30.0            # QUAL below this is low quality
 VARIANT_DEPTH_THRESHOLD = 20             # Total depth below this is low
 VARIANT_ALLELE_BALANCE_THRESHOLD = 0.15  # AD ratio below this is suspicious
 
+# VariantCall columns read by apply_variant_quality_from_vcf
+_QC_FIELDS = attrgetter("filter", "quality", "ad", "zygosity")
+_PASSING_FILTERS = frozenset({"PASS", "."})
+_AMBIGUOUS_ZYGOSITIES = frozenset({"./.", "UNKNOWN", "", None})
+_QC_COLUMNS = attrgetter("filter", "quality", "ad")
+_ZYGOSITY = attrgetter("zygosity")
+
+# VariantQualityResult flag columns (all bools) for apply_variant_quality_penalties
+_PASSES_FILTER = attrgetter("passes_filter")
+_QUALITY_ADEQUATE = attrgetter("quality_adequate")
+_DEPTH_ADEQUATE = attrgetter("depth_adequate")
+_GENOTYPE_CLEAR = attrgetter("genotype_clear")
+_QC_COLUMN_SUM_MIN = 64
+
+
+def _count_qc_failures(
+    variants: Sequence,
+    qual_threshold: float,
+    depth_threshold: int,
+    balance_threshold: float,
+) -> Tuple[int, int, int, int]:
+    """
+    Count (failed FILTER, low QUAL, low depth/allele balance, ambiguous GT)
+    over VariantCall objects in a single pass.
+
+    The inner loop of apply_variant_quality_from_vcf. Thresholds and lookup
+    sets are bound as locals so nothing is resolved from module globals
+    per variant.
+    """
+    passing_filters = _PASSING_FILTERS
+    ambiguous_zygosities = _AMBIGUOUS_ZYGOSITIES
+    failed_filter = low_qual = low_depth = ambiguous_gt = 0
+
+    # One C-level attrgetter call per variant pulls the four QC columns
+    # (FILTER, QUAL, AD, GT) instead of four getattr lookups.
+    for filt, qual, ad, zyg in map(_QC_FIELDS, variants):
+        # 1. FILTER check
+        if filt and filt not in passing_filters:
+            failed_filter += 1
+
+        # 2. QUAL check
+        if (qual or 0.0) < qual_threshold:
+            low_qual += 1
+
+        # 3. Depth check (from AD field)
+        if ad and len(ad) >= 2:
+            total_depth = sum(ad)
+            if total_depth < depth_threshold:
+                low_depth += 1
+            else:
+                # Allele balance check (suspicious balance counts as low depth)
+                alt_ratio = ad[1] / total_depth if total_depth > 0 else 0
+                if alt_ratio < balance_threshold:
+                    low_depth += 1
+
+        # 4. Genotype check
+        if zyg in ambiguous_zygosities:
+            ambiguous_gt += 1
+
+    return failed_filter, low_qual, low_depth, ambiguous_gt
+
+
+# Default weights for calculate_weighted_confidence (can be tuned per gene)
+_WEIGHTED_COMPONENTS = (
+    "variant_quality",
+    "allele_coverage",
+    "genome_build_validity",
+    "cnv_evaluation",
+    "diplotype_determinism",
+    "cpic_applicability",
+)
+_DEFAULT_COMPONENT_WEIGHTS = (0.25, 0.20, 0.10, 0.15, 0.25, 0.05)
+_WEIGHTED_SCORES = attrgetter(*_WEIGHTED_COMPONENTS)
+
+
+# ---------------------------------------------------------------------------
+# Penalty audit messages (rendered lazily by ConfidenceBreakdown.to_dict)
+# ---------------------------------------------------------------------------
+
+_PENALTY_TEMPLATES: Dict[str, str] = {
+    # apply_variant_quality_penalties
+    "QC_FAILED_FILTER": "FILTER≠PASS on {0}/{1} variants (−{2:.2f})",
+    "QC_LOW_QUALITY": "Low QUAL on {0}/{1} variants (−{2:.2f})",
+    "QC_LOW_DEPTH": "Low depth on {0}/{1} variants (−{2:.2f})",
+    "QC_AMBIGUOUS_GT": "Ambiguous GT on {0}/{1} variants (−{2:.2f})",
+    # apply_variant_quality_from_vcf
+    "VCF_LOW_QUAL": f"Low QUAL (<{VARIANT_QUAL_THRESHOLD}) on {{0}}/{{1}} variants (−{{2:.2f}})",
+    "VCF_LOW_DEPTH": "Low depth/allele-balance on {0}/{1} variants (−{2:.2f})",
+    "VCF_AMBIGUOUS_GT": "Ambiguous genotype on {0}/{1} variants (−{2:.2f})",
+    # genome build / coverage / phase / CNV
+    "UNKNOWN_GENOME_BUILD": "Unknown genome build (−{0:.2f})",
+    "GRCH37_GENOME_BUILD": "GRCh37 build detected, GRCh38 expected (−{0:.2f})",
+    "NO_COVERAGE_DATA": "No coverage data provided for {0} (−{1:.2f})",
+    "MISSING_KEY_POSITIONS": "{0} key position(s) missing for {1} (−{2:.2f})",
+    "UNPHASED_COMPOUND_HET": "Unphased compound heterozygote (−{0:.2f})",
+    "CNV_NOT_EVALUATED": "CNV not evaluated for {0} (−{1:.2f})",
+    # diplotype determinism
+    "DIPLOTYPE_QUALITY": "Diplotype quality: {0} (−{1:.2f})",
+    "INDETERMINATE_DIPLOTYPE": "Indeterminate diplotype (−{0:.2f})",
+    "PARTIAL_MATCH": "Partial allele definition match (−{0:.2f})",
+    "WILDTYPE_NO_COVERAGE": "Wildtype assumed without verifying key positions (−{0:.2f})",
+    # CPIC applicability
+    "NO_CPIC_RULE": "No specific CPIC recommendation found (−{0:.2f})",
+    "PHENOTYPE_INDETERMINATE": "Phenotype is Indeterminate (−{0:.2f})",
+}
+
+
+def _format_penalty(entry: Union[str, tuple]) -> str:
+    """Render one penalties_applied entry (free text passes through)."""
+    if isinstance(entry, str):
+        return entry
+    code, *args = entry
+    return _PENALTY_TEMPLATES[code].format(*args)
+
+
+def _apply_proportional_penalties(
+    bd: ConfidenceBreakdown,
+    total: int,
+    checks: Sequence[Tuple[int, float, str]],
+) -> float:
+    """
+    Record (count, penalty constant, audit code) checks scaled by the
+    fraction of variants affected; returns the summed deduction.
+    """
+    deduction = 0.0
+    for count, penalty_const, code in checks:
+        if count:
+            penalty = penalty_const * (count / total)
+            deduction += penalty
+            bd.penalties_applied.append((code, count, total, penalty))
+    return deduction
+
 
 # ---------------------------------------------------------------------------
 # Calculator
@@ -327,55 +565,35 @@ class ConfidenceCalculator:
         Each failed criterion deducts from the base 1.0 score.
         Multiple low-quality variants compound the penalty.
         """
-        if not quality_results:
-            return
-
-        total_variants = len(quality_results)
-        if total_variants == 0:
+        if not (total_variants := len(quality_results)):
             return
 
-        # Count failures across all variants
-        failed_filter_count = sum(1 for q in quality_results if not q.passes_filter)
-        low_quality_count = sum(1 for q in quality_results if not q.quality_adequate)
-        low_depth_count = sum(1 for q in quality_results if not q.depth_adequate)
-        ambiguous_gt_count = sum(1 for q in quality_results if not q.genotype_clear)
+        if total_variants >= _QC_COLUMN_SUM_MIN:
+            # Large panels: sum each bool flag column in C (one attrgetter
+            # map per flag), which beats the Python loop past ~64 variants
+            failed_filter_count = total_variants - sum(map(_PASSES_FILTER, quality_results))
+            low_quality_count = total_variants - sum(map(_QUALITY_ADEQUATE, quality_results))
+            low_depth_count = total_variants - sum(map(_DEPTH_ADEQUATE, quality_results))
+            ambiguous_gt_count = total_variants - sum(map(_GENOTYPE_CLEAR, quality_results))
+        else:
+            # Count failures across all variants in a single pass
+            failed_filter_count = low_quality_count = low_depth_count = ambiguous_gt_count = 0
+            for q in quality_results:
+                failed_filter_count += not q.passes_filter
+                low_quality_count += not q.quality_adequate
+                low_depth_count += not q.depth_adequate
+                ambiguous_gt_count += not q.genotype_clear
 
         # Proportional penalties (fraction of variants affected)
-        deduction = 0.0
-
-        if failed_filter_count:
-            frac = failed_filter_count / total_variants
-            penalty = PENALTY_FAILED_FILTER * frac
-            deduction += penalty
-            bd.penalties_applied.append(
-                f"FILTER≠PASS on {failed_filter_count}/{total_variants} variants (−{penalty:.2f})"
-            )
-
-        if low_quality_count:
-            frac = low_quality_count / total_variants
-            penalty = PENALTY_LOW_QUALITY * frac
-            deduction += penalty
-            bd.penalties_applied.append(
-                f"Low QUAL on {low_quality_count}/{total_variants} variants (−{penalty:.2f})"
-            )
-
-        if low_depth_count:
-            frac = low_depth_count / total_variants
-            penalty = PENALTY_LOW_DEPTH * frac
-            deduction += penalty
-            bd.penalties_applied.append(
-                f"Low depth on {low_depth_count}/{total_variants} variants (−{penalty:.2f})"
-            )
-
-        if ambiguous_gt_count:
-            frac = ambiguous_gt_count / total_variants
-            penalty = PENALTY_AMBIGUOUS_GENOTYPE * frac
-            deduction += penalty
-            bd.penalties_applied.append(
-                f"Ambiguous GT on {ambiguous_gt_count}/{total_variants} variants (−{penalty:.2f})"
-            )
+        deduction = _apply_proportional_penalties(bd, total_variants, (
+            (failed_filter_count, PENALTY_FAILED_FILTER, "QC_FAILED_FILTER"),
+            (low_quality_count, PENALTY_LOW_QUALITY, "QC_LOW_QUALITY"),
+            (low_depth_count, PENALTY_LOW_DEPTH, "QC_LOW_DEPTH"),
+            (ambiguous_gt_count, PENALTY_AMBIGUOUS_GENOTYPE, "QC_AMBIGUOUS_GT"),
+        ))
 
-        bd.variant_quality = max(0.0, 1.0 - deduction)
+        score = 1.0 - deduction
+        bd.variant_quality = score if score > 0.0 else 0.0
 
     @staticmethod
     def apply_variant_quality_from_vcf(
@@ -391,80 +609,38 @@ class ConfidenceCalculator:
         This is the PRIMARY method that should be called in the main flow.
         ``apply_variant_quality_penalties`` is for pre-computed QC results.
         """
-        if not variants:
+        if not (total := len(variants)):
             return
 
-        total = len(variants)
-        failed_filter = 0
-        low_qual = 0
-        low_depth = 0
-        ambiguous_gt = 0
-
-        for v in variants:
-            # 1. FILTER check
-            filt = getattr(v, 'filter', None)
-            if filt and filt not in ('PASS', '.', None):
-                failed_filter += 1
-
-            # 2. QUAL check
-            qual = getattr(v, 'quality', 0.0) or 0.0
-            if qual < VARIANT_QUAL_THRESHOLD:
-                low_qual += 1
-
-            # 3. Depth check (from AD field)
-            ad = getattr(v, 'ad', None)
-            if ad and len(ad) >= 2:
-                total_depth = sum(ad)
-                if total_depth < VARIANT_DEPTH_THRESHOLD:
-                    low_depth += 1
-                else:
-                    # Allele balance check
-                    alt_ratio = ad[1] / total_depth if total_depth > 0 else 0
-                    if alt_ratio < VARIANT_ALLELE_BALANCE_THRESHOLD:
-                        low_depth += 1  # Suspicious allele balance
-
-            # 4. Genotype check
-            zyg = getattr(v, 'zygosity', '')
-            if zyg in ('./.', 'UNKNOWN', '', None):
-                ambiguous_gt += 1
-
-        # Apply proportional penalties
-        deduction = 0.0
-
-        if failed_filter:
-            frac = failed_filter / total
-            penalty = PENALTY_FAILED_FILTER * frac
-            deduction += penalty
-            bd.penalties_applied.append(
-                f"FILTER≠PASS on {failed_filter}/{total} variants (−{penalty:.2f})"
-            )
-
-        if low_qual:
-            frac = low_qual / total
-            penalty = PENALTY_LOW_QUALITY * frac
-            deduction += penalty
-            bd.penalties_applied.append(
-                f"Low QUAL (<{VARIANT_QUAL_THRESHOLD}) on {low_qual}/{total} variants (−{penalty:.2f})"
-            )
-
-        if low_depth:
-            frac = low_depth / total
-            penalty = PENALTY_LOW_DEPTH * frac
-            deduction += penalty
-            bd.penalties_applied.append(
-                f"Low depth/allele-balance on {low_depth}/{total} variants (−{penalty:.2f})"
+        if not any(map(any, map(_QC_COLUMNS, variants))):
+            # Callset without QC columns (aggregated / annotation-only VCFs).
+            # The scan above stops at the first record carrying FILTER, QUAL
+            # or AD, so QC-rich files pay for one record only. Policy is
+            # unchanged: FILTER and AD checks cannot fail, while a missing
+            # QUAL counts as low QUAL on every variant. Only the (always
+            # present) genotype column still needs checking.
+            failed_filter = low_depth = 0
+            low_qual = total
+            ambiguous_gt = sum(map(_AMBIGUOUS_ZYGOSITIES.__contains__, map(_ZYGOSITY, variants)))
+        else:
+            failed_filter, low_qual, low_depth, ambiguous_gt = _count_qc_failures(
+                variants,
+                VARIANT_QUAL_THRESHOLD,
+                VARIANT_DEPTH_THRESHOLD,
+                VARIANT_ALLELE_BALANCE_THRESHOLD,
             )
 
-        if ambiguous_gt:
-            frac = ambiguous_gt / total
-            penalty = PENALTY_AMBIGUOUS_GENOTYPE * frac
-            deduction += penalty
-            bd.penalties_applied.append(
-                f"Ambiguous genotype on {ambiguous_gt}/{total} variants (−{penalty:.2f})"
-            )
+        # Apply proportional penalties
+        deduction = _apply_proportional_penalties(bd, total, (
+            (failed_filter, PENALTY_FAILED_FILTER, "QC_FAILED_FILTER"),
+            (low_qual, PENALTY_LOW_QUALITY, "VCF_LOW_QUAL"),
+            (low_depth, PENALTY_LOW_DEPTH, "VCF_LOW_DEPTH"),
+            (ambiguous_gt, PENALTY_AMBIGUOUS_GENOTYPE, "VCF_AMBIGUOUS_GT"),
+        ))
 
         if deduction > 0:
-            bd.variant_quality = max(0.0, 1.0 - deduction)
+            score = 1.0 - deduction
+            bd.variant_quality = score if score > 0.0 else 0.0
 
     # -- Genome Build ------------------------------------------------------
 
@@ -474,18 +650,17 @@ class ConfidenceCalculator:
         genome_build: Optional[str],
     ) -> None:
         """Penalise allele_coverage when genome build is unknown or mismatched."""
-        if not genome_build or genome_build.lower() in ("unknown", ""):
-            penalty = PENALTY_UNKNOWN_GENOME_BUILD
-            bd.allele_coverage = min(bd.allele_coverage, max(0.0, 1.0 - penalty))
-            bd.penalties_applied.append(
-                f"Unknown genome build (−{penalty:.2f})"
-            )
-        elif genome_build in ("GRCh37", "hg19"):
-            penalty = PENALTY_GRCH37_GENOME_BUILD
-            bd.allele_coverage = min(bd.allele_coverage, max(0.0, 1.0 - penalty))
-            bd.penalties_applied.append(
-                f"GRCh37 build detected, GRCh38 expected (−{penalty:.2f})"
-            )
+        entry = _GENOME_BUILD_PENALTY.get(genome_build, False)
+        if entry is False:
+            # Unlisted spelling: only a case variant of "unknown" is penalised
+            entry = _UNKNOWN_BUILD_PENALTY if genome_build.lower() == "unknown" else None
+        if entry is None:
+            return
+        penalty = entry[1]
+        score = 1.0 - penalty
+        if score < bd.allele_coverage:
+            bd.allele_coverage = score if score > 0.0 else 0.0
+        bd.penalties_applied.append(entry)
 
     # -- Allele Coverage ---------------------------------------------------
 
@@ -493,31 +668,38 @@ class ConfidenceCalculator:
     def apply_allele_coverage_penalties(
         bd: ConfidenceBreakdown,
         gene: str,
-        observed_positions: Sequence[int],
-        key_positions: Sequence[int],
+        observed_positions: Iterable[int],
+        key_positions: Union[AbstractSet[int], Sequence[int]],
         has_coverage_data: bool,
     ) -> None:
         """Penalise allele_coverage based on how many key positions were evaluated."""
         if not has_coverage_data:
-            bd.allele_coverage = max(0.0, 1.0 - PENALTY_NO_COVERAGE_DATA)
+            score = 1.0 - PENALTY_NO_COVERAGE_DATA
+            bd.allele_coverage = score if score > 0.0 else 0.0
             bd.penalties_applied.append(
-                f"No coverage data provided for {gene} (−{PENALTY_NO_COVERAGE_DATA:.2f})"
+                ("NO_COVERAGE_DATA", gene, PENALTY_NO_COVERAGE_DATA)
             )
             return
 
         if not key_positions:
             return  # No key positions defined — cannot penalise
 
-        key_set = set(key_positions)
-        observed_set = set(observed_positions)
-        missing = key_set - observed_set
+        # Callers normally pass the loader's pre-built frozenset; only the
+        # observed positions need hashing per call.
+        key_set = (
+            key_positions
+            if isinstance(key_positions, (set, frozenset))
+            else frozenset(key_positions)
+        )
+        missing = key_set.difference(observed_positions)
 
         if missing:
             n = len(missing)
             penalty = min(PENALTY_MISSING_KEY_POSITION * n, 0.50)  # cap
-            bd.allele_coverage = max(0.0, 1.0 - penalty)
+            score = 1.0 - penalty
+            bd.allele_coverage = score if score > 0.0 else 0.0
             bd.penalties_applied.append(
-                f"{n} key position(s) missing for {gene} (−{penalty:.2f})"
+                ("MISSING_KEY_POSITIONS", n, gene, penalty)
             )
 
     # -- Phase Resolution --------------------------------------------------
@@ -530,9 +712,10 @@ class ConfidenceCalculator:
     ) -> None:
         """Penalise allele_coverage for unphased compound heterozygotes."""
         if is_compound_het and not has_phasing:
-            bd.allele_coverage = max(0.0, bd.allele_coverage - PENALTY_UNPHASED_COMPOUND_HET)
+            score = bd.allele_coverage - PENALTY_UNPHASED_COMPOUND_HET
+            bd.allele_coverage = score if score > 0.0 else 0.0
             bd.penalties_applied.append(
-                f"Unphased compound heterozygote (−{PENALTY_UNPHASED_COMPOUND_HET:.2f})"
+                ("UNPHASED_COMPOUND_HET", PENALTY_UNPHASED_COMPOUND_HET)
             )
 
     # -- CNV Evaluation ----------------------------------------------------
@@ -544,11 +727,13 @@ class ConfidenceCalculator:
         cnv_evaluated: bool = False,
     ) -> None:
         """Penalise cnv_evaluation for genes where CNV is relevant but not assessed."""
-        if gene in CNV_REQUIRED_GENES and not cnv_evaluated:
-            bd.cnv_evaluation = max(0.0, 1.0 - PENALTY_CNV_NOT_EVALUATED)
-            bd.penalties_applied.append(
-                f"CNV not evaluated for {gene} (−{PENALTY_CNV_NOT_EVALUATED:.2f})"
-            )
+        if cnv_evaluated or gene not in CNV_REQUIRED_GENES:
+            return
+        score = 1.0 - PENALTY_CNV_NOT_EVALUATED
+        bd.cnv_evaluation = score if score > 0.0 else 0.0
+        bd.penalties_applied.append(
+            ("CNV_NOT_EVALUATED", gene, PENALTY_CNV_NOT_EVALUATED)
+        )
 
     # -- Diplotype Determinism ---------------------------------------------
 
@@ -558,46 +743,52 @@ class ConfidenceCalculator:
         diplotype: str,
         is_partial_match: bool = False,
         is_wildtype_unverified: bool = False,
-        quality_category: Optional[str] = None,
+        quality_category: Optional[Union[DiplotypeQuality, str]] = None,
     ) -> None:
         """
         Penalise diplotype_determinism based on resolution quality.
 
         Args:
-            quality_category: One of the DIPLOTYPE_QUALITY_PENALTIES keys.
-                If provided, uses the standardized penalty instead of
-                ad-hoc partial_match/wildtype flags.
+            quality_category: A DiplotypeQuality (or, for older callers,
+                one of the DIPLOTYPE_QUALITY_PENALTIES keys). If provided,
+                uses the standardized penalty instead of ad-hoc
+                partial_match/wildtype flags.
         """
         deduction = 0.0
 
+        # Legacy callers pass the category name as a string
+        if isinstance(quality_category, str):
+            quality_category = DiplotypeQuality.__members__.get(quality_category)
+
         # New path: use quality category if provided
-        if quality_category and quality_category in DIPLOTYPE_QUALITY_PENALTIES:
-            deduction = DIPLOTYPE_QUALITY_PENALTIES[quality_category]
+        if quality_category is not None:
+            deduction = _DIPLOTYPE_QUALITY_PENALTY[quality_category]
             bd.penalties_applied.append(
-                f"Diplotype quality: {quality_category} (−{deduction:.2f})"
+                ("DIPLOTYPE_QUALITY", quality_category.name, deduction)
             )
         else:
             # Legacy path: flags-based penalties
-            if diplotype in ("Indeterminate", "Unknown"):
+            if diplotype in _INDETERMINATE_DIPLOTYPES:
                 deduction += PENALTY_INDETERMINATE
                 bd.penalties_applied.append(
-                    f"Indeterminate diplotype (−{PENALTY_INDETERMINATE:.2f})"
+                    ("INDETERMINATE_DIPLOTYPE", PENALTY_INDETERMINATE)
                 )
 
             if is_partial_match:
                 deduction += PENALTY_PARTIAL_MATCH
                 bd.penalties_applied.append(
-                    f"Partial allele definition match (−{PENALTY_PARTIAL_MATCH:.2f})"
+                    ("PARTIAL_MATCH", PENALTY_PARTIAL_MATCH)
                 )
 
             if is_wildtype_unverified:
                 deduction += PENALTY_WILDTYPE_NO_COVERAGE
                 bd.penalties_applied.append(
-                    f"Wildtype assumed without verifying key positions (−{PENALTY_WILDTYPE_NO_COVERAGE:.2f})"
+                    ("WILDTYPE_NO_COVERAGE", PENALTY_WILDTYPE_NO_COVERAGE)
                 )
 
         if deduction > 0:
-            bd.diplotype_determinism = max(0.0, 1.0 - deduction)
+            score = 1.0 - deduction
+            bd.diplotype_determinism = score if score > 0.0 else 0.0
 
     # -- CPIC Applicability ------------------------------------------------
 
@@ -613,17 +804,18 @@ class ConfidenceCalculator:
         if not has_cpic_rule:
             deduction += PENALTY_NO_CPIC_RULE
             bd.penalties_applied.append(
-                f"No specific CPIC recommendation found (−{PENALTY_NO_CPIC_RULE:.2f})"
+                ("NO_CPIC_RULE", PENALTY_NO_CPIC_RULE)
             )
 
         if phenotype_is_indeterminate:
             deduction += PENALTY_PHENOTYPE_INDETERMINATE
             bd.penalties_applied.append(
-                f"Phenotype is Indeterminate (−{PENALTY_PHENOTYPE_INDETERMINATE:.2f})"
+                ("PHENOTYPE_INDETERMINATE", PENALTY_PHENOTYPE_INDETERMINATE)
             )
 
         if deduction > 0:
-            bd.cpic_applicability = max(0.0, 1.0 - deduction)
+            score = 1.0 - deduction
+            bd.cpic_applicability = score if score > 0.0 else 0.0
 
 
     # -- Weighted Confidence (Alternative to Min-Based) -------------------
@@ -646,25 +838,20 @@ class ConfidenceCalculator:
         Returns:
             Weighted confidence score [0, 1]
         """
-        import math
-
-        # Default weights (can be tuned per gene)
         if weights is None:
-            weights = {
-                "variant_quality": 0.25,
-                "allele_coverage": 0.20,
-                "genome_build_validity": 0.10,
-                "cnv_evaluation": 0.15,
-                "diplotype_determinism": 0.25,
-                "cpic_applicability": 0.05,
-            }
-
-        # Weighted geometric mean
-        log_sum = 0.0
-        for component, weight in weights.items():
-            score = getattr(bd, component)
-            # Prevent log(0) by clamping to minimum 0.01
-            log_sum += weight * math.log(max(0.01, score))
+            # Default weights: fixed component order, one attrgetter call
+            scores = _WEIGHTED_SCORES(bd)
+            component_weights = _DEFAULT_COMPONENT_WEIGHTS
+        else:
+            scores = [getattr(bd, component) for component in weights]
+            component_weights = weights.values()
+
+        # Weighted geometric mean; clamp to 0.01 to prevent log(0)
+        log = math.log
+        log_sum = math.fsum([
+            weight * log(score if score > 0.01 else 0.01)
+            for weight, score in zip(component_weights, scores)
+        ])
 
         confidence = math.exp(log_sum)
 
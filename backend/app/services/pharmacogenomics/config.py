@@ -3,7 +3,8 @@ Configuration for pharmacogenomics service.
 Centralizes tunable parameters for diplotype resolution and confidence scoring.
 """
 
-from typing import Dict
+import copy
+from typing import Dict, Optional
 from pydantic import BaseModel, Field
 
 
@@ -195,33 +196,49 @@ class PharmacogenomicsConfig(BaseModel):
     )
 
 
-# Global configuration instance
-_config: PharmacogenomicsConfig = PharmacogenomicsConfig()
+# Global configuration instance, built on first use so importing this module
+# doesn't run pydantic validation
+_config: Optional[PharmacogenomicsConfig] = None
 
 
 def get_config() -> PharmacogenomicsConfig:
     """Get the global configuration instance."""
+    global _config
+    if _config is None:
+        _config = PharmacogenomicsConfig()
     return _config
 
 
 def update_config(**kwargs):
     """Update configuration parameters."""
     global _config
-    current_dict = _config.model_dump()
+    # Untouched sections go back in as model instances, which pydantic accepts
+    # without re-validating; only the sections being patched are dumped and
+    # validated again.
+    fields = dict(get_config())
+    patched: Dict[str, object] = {}
 
     # Update nested parameters
     for key, value in kwargs.items():
         if '.' in key:
             # Handle nested keys like 'confidence_penalties.missing_key_position'
             parts = key.split('.')
-            current = current_dict
-            for part in parts[:-1]:
+            section = parts[0]
+            if section not in patched:
+                current = fields[section]
+                patched[section] = (
+                    current.model_dump() if isinstance(current, BaseModel)
+                    else copy.deepcopy(current)
+                )
+            current = patched[section]
+            for part in parts[1:-1]:
                 current = current[part]
             current[parts[-1]] = value
         else:
-            current_dict[key] = value
+            patched[key] = value
 
-    _config = PharmacogenomicsConfig(**current_dict)
+    fields.update(patched)
+    _config = PharmacogenomicsConfig(**fields)
     return _config
 
 
@@ -242,20 +259,20 @@ def save_config_to_file(filepath: str):
     import json
 
     with open(filepath, 'w') as f:
-        json.dump(_config.model_dump(), f, indent=2)
+        json.dump(get_config().model_dump(), f, indent=2)
 
 
 # Convenience accessors
 def get_confidence_penalties() -> ConfidencePenalties:
     """Get confidence penalties configuration."""
-    return _config.confidence_penalties
+    return get_config().confidence_penalties
 
 
 def get_diplotype_config() -> DiplotypeResolutionConfig:
     """Get diplotype resolution configuration."""
-    return _config.diplotype_resolution
+    return get_config().diplotype_resolution
 
 
 def get_activity_scores() -> ActivityScoreConfig:
     """Get activity score configuration."""
-    return _config.activity_scores
+    return get_config().activity_scores
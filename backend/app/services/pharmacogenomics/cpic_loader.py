@@ -5,7 +5,7 @@ Provides optimized lookup structures for diplotype resolution and risk assessmen
 
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, FrozenSet, List, Optional, Set
 from functools import lru_cache
 
 
@@ -53,6 +53,27 @@ class CPICDataLoader:
         self._genes = self._data.get('genes', {})
         self._drugs = self._data.get('drugs', {})
 
+        # Pre-build the per-allele variant sets used by diplotype scoring so
+        # each request does set lookups instead of rebuilding sets from lists.
+        self._allele_variant_sets: Dict[str, Dict[str, FrozenSet[str]]] = {
+            gene: {
+                allele: frozenset(variants)
+                for allele, variants in gene_data.get('allele_definitions', {}).items()
+            }
+            for gene, gene_data in self._genes.items()
+        }
+
+        # Key positions are static per gene; coverage scoring only needs
+        # them as a set, so build each one once here.
+        self._key_position_sets: Dict[str, FrozenSet[int]] = {
+            gene: frozenset(
+                pos_info['pos']
+                for pos_info in gene_data.get('positions', {}).values()
+                if 'pos' in pos_info
+            )
+            for gene, gene_data in self._genes.items()
+        }
+
         if config.verbose_logging:
             print(f"CPIC Data Loader initialized: {len(self._genes)} genes, {len(self._drugs)} drugs")
 
@@ -126,6 +147,10 @@ class CPICDataLoader:
         positions_data = gene_data.get('positions', {})
         return [pos_info['pos'] for pos_info in positions_data.values() if 'pos' in pos_info]
 
+    def get_key_position_set(self, gene: str) -> FrozenSet[int]:
+        """Get the key genomic positions for a gene as a pre-built frozenset."""
+        return self._key_position_sets.get(gene, frozenset())
+
     def get_supported_genes(self) -> List[str]:
         """Get list of all supported gene symbols."""
         return list(self._genes.keys())
@@ -249,6 +274,10 @@ class CPICDataLoader:
         allele_defs = self.get_allele_definitions(gene)
         return allele_defs.get(allele, [])
 
+    def get_allele_variant_set(self, gene: str, allele: str) -> FrozenSet[str]:
+        """Get the defining variants of an allele as a pre-built frozenset."""
+        return self._allele_variant_sets.get(gene, {}).get(allele, frozenset())
+
     @lru_cache(maxsize=128)
     def normalize_diplotype(self, diplotype: str) -> str:
         """
@@ -13,11 +13,14 @@ from __future__ import annotations
 
 import math
 import json
+import os
+import time
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from collections import defaultdict
+from functools import lru_cache
 
 
 # ============================================================================
@@ -31,6 +34,20 @@ MAX_PRIOR = 1.50                    # Ceiling for prior values
 MAX_DELTA_PER_UPDATE = 0.10         # Maximum change per single feedback
 MIN_FEEDBACK_FOR_UPDATE = 1         # Minimum feedback events before applying
 
+NS_PER_DAY = 86_400 * 10**9
+
+
+# Event times are plain time.time_ns() integers; ISO strings only appear in
+# the persisted priors file, so conversion happens at that boundary.
+
+def _ns_to_iso(timestamp_ns: int) -> str:
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
+
+
+@lru_cache(maxsize=32)
+def _iso_to_ns(iso_timestamp: str) -> int:
+    return int(datetime.fromisoformat(iso_timestamp).timestamp() * 10**9)
+
 
 # ============================================================================
 # Data Models
@@ -42,14 +59,13 @@ class FeedbackEvent:
     gene: str
     reported_diplotype: str
     correct_diplotype: str
-    timestamp: datetime
+    timestamp: int                   # Nanoseconds since epoch (time.time_ns())
     feedback_quality: float = 1.0    # Clinician confidence [0, 1]
     comments: Optional[str] = None
 
-    def months_since(self, reference_time: datetime) -> float:
-        """Calculate months elapsed since this feedback."""
-        delta = reference_time - self.timestamp
-        return delta.days / 30.0
+    def months_since(self, reference_ns: int) -> float:
+        """Calculate months elapsed (in whole days) since this feedback."""
+        return ((reference_ns - self.timestamp) // NS_PER_DAY) / 30.0
 
 
 @dataclass
@@ -170,28 +186,29 @@ class BayesianFeedbackLearner:
     def batch_calibration(
         self,
         feedback_history: List[FeedbackEvent],
-        reference_time: Optional[datetime] = None,
+        reference_ns: Optional[int] = None,
     ) -> LearningPriors:
         """
         Recalibrate all priors from accumulated feedback history.
 
         Args:
             feedback_history: All feedback events
-            reference_time: Reference time for decay (default: now)
+            reference_ns: Reference time for decay, ns since epoch (default: now)
 
         Returns:
             Updated LearningPriors object
         """
-        if reference_time is None:
-            reference_time = datetime.now()
+        if reference_ns is None:
+            reference_ns = time.time_ns()
+        reference_iso = _ns_to_iso(reference_ns)
 
         priors = LearningPriors(
             genes={},
             metadata={
                 "total_feedback_events": len(feedback_history),
-                "last_updated": reference_time.isoformat(),
+                "last_updated": reference_iso,
             },
-            last_calibration=reference_time.isoformat(),
+            last_calibration=reference_iso,
         )
 
         # Group feedback by (gene, correct_diplotype)
@@ -211,7 +228,7 @@ class BayesianFeedbackLearner:
             events_sorted = sorted(events, key=lambda e: e.timestamp)
 
             for event in events_sorted:
-                months_ago = event.months_since(reference_time)
+                months_ago = event.months_since(reference_ns)
                 current, _ = self.update_prior(
                     current_prior=current,
                     feedback_quality=event.feedback_quality,
@@ -246,8 +263,8 @@ class BayesianFeedbackLearner:
 
         # Calculate months since last calibration
         if current_priors.last_calibration:
-            last_cal = datetime.fromisoformat(current_priors.last_calibration)
-            months_since = new_feedback.months_since(last_cal)
+            last_cal_ns = _iso_to_ns(current_priors.last_calibration)
+            months_since = new_feedback.months_since(last_cal_ns)
         else:
             months_since = 0.0
 
@@ -272,7 +289,7 @@ class BayesianFeedbackLearner:
         updated_priors.metadata["total_feedback_events"] = (
             current_priors.metadata.get("total_feedback_events", 0) + 1
         )
-        updated_priors.metadata["last_updated"] = datetime.now().isoformat()
+        updated_priors.metadata["last_updated"] = _ns_to_iso(new_feedback.timestamp)
         updated_priors.metadata["last_update_explanation"] = explanation
 
         return updated_priors
@@ -308,7 +325,7 @@ class LearningPriorsManager:
             return self._create_default_priors()
 
     def save(self, priors: LearningPriors):
-        """Save learning priors to disk."""
+        """Save learning priors to disk (atomically, via a temp file + rename)."""
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
 
         data = {
@@ -318,8 +335,10 @@ class LearningPriorsManager:
             "last_calibration": priors.last_calibration,
         }
 
-        with open(self.file_path, 'w') as f:
+        tmp_path = self.file_path.with_name(self.file_path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
             json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.file_path)
 
     def _create_default_priors(self) -> LearningPriors:
         """Create default empty priors."""
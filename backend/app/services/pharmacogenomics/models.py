@@ -4,8 +4,9 @@ These models represent the intermediate data structures used for processing
 VCF data and resolving diplotypes/phenotypes.
 """
 
+from dataclasses import dataclass, field
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import Annotated, List, Optional, Dict
 from enum import Enum
 from datetime import datetime
 
@@ -20,37 +21,46 @@ class IndeterminateReason(str, Enum):
     UNSUPPORTED_GENE = "unsupported_gene"  # Gene not in database
 
 
-class VariantCall(BaseModel):
-    """Represents a single variant call from VCF data."""
-    chrom: str = Field(..., description="Chromosome identifier")
-    pos: int = Field(..., description="Position on chromosome")
-    rsid: Optional[str] = Field(None, description="dbSNP reference ID")
-    ref: str = Field(..., description="Reference allele")
-    alt: str = Field(..., description="Alternate allele")
-    zygosity: str = Field(..., description="Zygosity: HET, HOM_REF, or HOM_ALT")
-    quality: float = Field(default=0.0, description="Variant quality score")
-    filter: Optional[str] = Field(None, description="Filter status (PASS, etc.)")
-    ad: Optional[List[int]] = Field(None, description="Allele depth (reference, alternate)")
-    star_allele: Optional[str] = Field(None, description="Star allele annotation from VCF INFO")
+@dataclass(slots=True, kw_only=True)
+class VariantCall:
+    """
+    Represents a single variant call from VCF data.
+
+    A slotted dataclass rather than a BaseModel: one is built per variant in
+    the VCF hot path from already-typed parser output, so construction skips
+    validation. Pydantic still validates it where it appears in API bodies
+    and response models.
+    """
+    chrom: Annotated[str, Field(description="Chromosome identifier")]
+    pos: Annotated[int, Field(description="Position on chromosome")]
+    rsid: Annotated[Optional[str], Field(description="dbSNP reference ID")] = None
+    ref: Annotated[str, Field(description="Reference allele")]
+    alt: Annotated[str, Field(description="Alternate allele")]
+    zygosity: Annotated[str, Field(description="Zygosity: HET, HOM_REF, or HOM_ALT")]
+    quality: Annotated[float, Field(description="Variant quality score")] = 0.0
+    filter: Annotated[Optional[str], Field(description="Filter status (PASS, etc.)")] = None
+    ad: Annotated[Optional[List[int]], Field(description="Allele depth (reference, alternate)")] = None
+    star_allele: Annotated[Optional[str], Field(description="Star allele annotation from VCF INFO")] = None
 
     # Phasing information
-    phased: bool = Field(default=False, description="Whether this variant is phased")
-    phase_set: Optional[str] = Field(None, description="Phase set ID (PS tag from VCF)")
-    haplotype: Optional[int] = Field(None, description="Haplotype assignment (0 or 1)")
+    phased: Annotated[bool, Field(description="Whether this variant is phased")] = False
+    phase_set: Annotated[Optional[str], Field(description="Phase set ID (PS tag from VCF)")] = None
+    haplotype: Annotated[Optional[int], Field(description="Haplotype assignment (0 or 1)")] = None
 
     def variant_key(self) -> str:
         """Generate a unique key for this variant: POS:REF:ALT"""
         return f"{self.pos}:{self.ref}:{self.alt}"
 
 
-class GenotypeData(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class GenotypeData:
     """Genotype data for a specific gene from a single sample."""
-    sample_id: str = Field(..., description="Sample identifier")
-    gene_symbol: str = Field(..., description="Gene symbol (e.g., CYP2D6)")
-    variants: List[VariantCall] = Field(default_factory=list, description="List of variant calls")
-    coverage_mean: Optional[float] = Field(None, description="Mean coverage depth across gene region")
-    covered_positions: List[int] = Field(default_factory=list, description="Specific positions with adequate coverage")
-    genome_build: Optional[str] = Field(None, description="Genome build (GRCh37, GRCh38, or None/Unknown)")
+    sample_id: Annotated[str, Field(description="Sample identifier")]
+    gene_symbol: Annotated[str, Field(description="Gene symbol (e.g., CYP2D6)")]
+    variants: Annotated[List[VariantCall], Field(description="List of variant calls")] = field(default_factory=list)
+    coverage_mean: Annotated[Optional[float], Field(description="Mean coverage depth across gene region")] = None
+    covered_positions: Annotated[List[int], Field(description="Specific positions with adequate coverage")] = field(default_factory=list)
+    genome_build: Annotated[Optional[str], Field(description="Genome build (GRCh37, GRCh38, or None/Unknown)")] = None
 
     def get_variant_keys(self) -> List[str]:
         """Get all variant keys for this genotype."""
@@ -42,6 +42,26 @@ class InteractionSeverity(str, Enum):
     MINOR = "minor"            # Informational, standard monitoring
 
 
+# Higher rank = more severe; used to pick the most severe interaction
+SEVERITY_RANK: Dict[InteractionSeverity, int] = {
+    InteractionSeverity.CRITICAL: 4,
+    InteractionSeverity.MAJOR: 3,
+    InteractionSeverity.MODERATE: 2,
+    InteractionSeverity.MINOR: 1,
+}
+
+
+# Interaction categories that drive the combined-score multiplier
+SYNERGISTIC_TYPES = frozenset({
+    InteractionType.SYNERGISTIC_TOXICITY,
+    InteractionType.SYNERGISTIC_INEFFICACY,
+})
+INHIBITORY_TYPES = frozenset({
+    InteractionType.ENZYME_INHIBITION,
+    InteractionType.COMPETITIVE_METABOLISM,
+})
+
+
 # ============================================================================
 # Data Models
 # ============================================================================
@@ -292,6 +312,27 @@ def get_interaction_database() -> List[DrugDrugInteraction]:
     return KNOWN_INTERACTIONS
 
 
+def interaction_severity_rank(interaction: DrugDrugInteraction) -> int:
+    """Sort/max key: SEVERITY_RANK of the interaction's severity (0 if unknown)."""
+    return SEVERITY_RANK.get(interaction.severity, 0)
+
+
+def _build_pair_gene_index(
+    interaction_db: List[DrugDrugInteraction]
+) -> Dict[Tuple[str, str, str], DrugDrugInteraction]:
+    """
+    Index interactions by (drug_a, drug_b, gene), both drug orderings, lowercased.
+    The first database entry wins, matching the original linear scan.
+    """
+    index: Dict[Tuple[str, str, str], DrugDrugInteraction] = {}
+    for interaction in interaction_db:
+        a = interaction.drug_a.lower()
+        b = interaction.drug_b.lower()
+        index.setdefault((a, b, interaction.gene), interaction)
+        index.setdefault((b, a, interaction.gene), interaction)
+    return index
+
+
 # ============================================================================
 # Multi-Drug Risk Analyzer
 # ============================================================================
@@ -310,6 +351,7 @@ class MultiDrugRiskAnalyzer:
 
     def __init__(self, interaction_db: Optional[List[DrugDrugInteraction]] = None):
         self.interaction_db = interaction_db or KNOWN_INTERACTIONS
+        self._pair_index = _build_pair_gene_index(self.interaction_db)
 
     def analyze_multi_drug_risk(
         self,
@@ -401,15 +443,15 @@ class MultiDrugRiskAnalyzer:
     ) -> List[DrugDrugInteraction]:
         """Detect drug-drug-gene interactions."""
         interactions = []
+        drugs_lower = [assess.drug.lower() for assess in drug_assessments]
 
         # Check all drug pairs
         for i, assess_a in enumerate(drug_assessments):
-            for assess_b in drug_assessments[i+1:]:
-                # Check both orderings in interaction database
-                interaction = self._find_interaction(
-                    assess_a.drug,
-                    assess_b.drug,
-                    assess_a.gene
+            drug_a_lower = drugs_lower[i]
+            for j in range(i + 1, len(drug_assessments)):
+                # Index holds both orderings of every pair
+                interaction = self._pair_index.get(
+                    (drug_a_lower, drugs_lower[j], assess_a.gene)
                 )
 
                 if interaction:
@@ -428,22 +470,7 @@ class MultiDrugRiskAnalyzer:
         gene: str
     ) -> Optional[DrugDrugInteraction]:
         """Find interaction in database."""
-        drug_a_lower = drug_a.lower()
-        drug_b_lower = drug_b.lower()
-
-        for interaction in self.interaction_db:
-            # Check both orderings
-            if (
-                (interaction.drug_a.lower() == drug_a_lower and
-                 interaction.drug_b.lower() == drug_b_lower and
-                 interaction.gene == gene) or
-                (interaction.drug_a.lower() == drug_b_lower and
-                 interaction.drug_b.lower() == drug_a_lower and
-                 interaction.gene == gene)
-            ):
-                return interaction
-
-        return None
+        return self._pair_index.get((drug_a.lower(), drug_b.lower(), gene))
 
     def _calculate_combined_risk(
         self,
@@ -459,10 +486,8 @@ class MultiDrugRiskAnalyzer:
             return 0.0, []
 
         # Get individual risk scores
-        individual_scores = []
-        for assess in drug_assessments:
-            score = assess.risk.risk_score if assess.risk.risk_score else 0.0
-            individual_scores.append(score)
+        individual_scores = [assess.risk.risk_score or 0.0 for assess in drug_assessments]
+        total_contribution = sum(individual_scores)
 
         # Apply interaction multipliers
         interaction_multipliers = self._calculate_interaction_multipliers(
@@ -470,28 +495,23 @@ class MultiDrugRiskAnalyzer:
             interactions
         )
 
-        # Calculate combined score using weighted approach
-        # For synergistic interactions: use max with multiplier
-        # For additive: use weighted sum
-        # For competitive: use modified average
+        # Base score: weighted maximum (highest risk dominates, but other
+        # risks contribute)
+        max_score = max(individual_scores)
+        avg_score = total_contribution / len(individual_scores)
+        base_score = 0.7 * max_score + 0.3 * avg_score
 
         if interactions:
-            # Has interactions - use interaction-aware scoring
+            # Has interactions - scale by the dominant interaction type
             combined_score = self._calculate_interaction_aware_score(
-                individual_scores,
-                interaction_multipliers,
+                base_score,
                 interactions
             )
         else:
-            # No interactions - use simple weighted maximum
-            # (highest risk dominates, but other risks contribute)
-            max_score = max(individual_scores)
-            avg_score = sum(individual_scores) / len(individual_scores)
-            combined_score = 0.7 * max_score + 0.3 * avg_score
+            combined_score = base_score
 
         # Build risk contributions
         contributions = []
-        total_contribution = sum(individual_scores)
 
         for i, assess in enumerate(drug_assessments):
             contribution_pct = (
@@ -543,36 +563,30 @@ class MultiDrugRiskAnalyzer:
 
     def _calculate_interaction_aware_score(
         self,
-        individual_scores: List[float],
-        interaction_multipliers: Dict[str, float],
+        base_score: float,
         interactions: List[DrugDrugInteraction]
     ) -> float:
         """Calculate combined score considering interaction types."""
 
-        # Categorize interactions
-        synergistic = [i for i in interactions if i.interaction_type in (
-            InteractionType.SYNERGISTIC_TOXICITY,
-            InteractionType.SYNERGISTIC_INEFFICACY
-        )]
-
-        inhibitory = [i for i in interactions if i.interaction_type in (
-            InteractionType.ENZYME_INHIBITION,
-            InteractionType.COMPETITIVE_METABOLISM
-        )]
-
-        # Base score: weighted maximum
-        max_score = max(individual_scores)
-        avg_score = sum(individual_scores) / len(individual_scores)
-        base_score = 0.7 * max_score + 0.3 * avg_score
+        # Largest multiplier per interaction category, folded in one pass
+        max_synergy_multiplier = None
+        max_inhibit_multiplier = None
+        for interaction in interactions:
+            if interaction.interaction_type in SYNERGISTIC_TYPES:
+                if (max_synergy_multiplier is None
+                        or interaction.risk_multiplier > max_synergy_multiplier):
+                    max_synergy_multiplier = interaction.risk_multiplier
+            elif interaction.interaction_type in INHIBITORY_TYPES:
+                if (max_inhibit_multiplier is None
+                        or interaction.risk_multiplier > max_inhibit_multiplier):
+                    max_inhibit_multiplier = interaction.risk_multiplier
 
         # Apply synergistic multiplier if present
-        if synergistic:
-            max_synergy_multiplier = max(i.risk_multiplier for i in synergistic)
+        if max_synergy_multiplier is not None:
             base_score = base_score * max_synergy_multiplier
 
         # Apply inhibitory multiplier if present
-        elif inhibitory:
-            max_inhibit_multiplier = max(i.risk_multiplier for i in inhibitory)
+        elif max_inhibit_multiplier is not None:
             base_score = base_score * max_inhibit_multiplier
 
         # Clamp to [0, 100]
@@ -643,17 +657,7 @@ class MultiDrugRiskAnalyzer:
         if not interactions:
             return "none"
 
-        severity_order = {
-            InteractionSeverity.CRITICAL: 4,
-            InteractionSeverity.MAJOR: 3,
-            InteractionSeverity.MODERATE: 2,
-            InteractionSeverity.MINOR: 1,
-        }
-
-        max_severity = max(
-            interactions,
-            key=lambda i: severity_order.get(i.severity, 0)
-        )
+        max_severity = max(interactions, key=interaction_severity_rank)
 
         return max_severity.severity.value
 
@@ -784,12 +788,17 @@ class InteractionMatrix:
         self.by_drug_pair: Dict[Tuple[str, str], List[DrugDrugInteraction]] = {}
         self.by_gene: Dict[str, List[DrugDrugInteraction]] = {}
         self.by_severity: Dict[str, List[DrugDrugInteraction]] = {}
+        self.by_drug: Dict[str, List[DrugDrugInteraction]] = {}
 
         for interaction in self.interactions:
             # Index by drug pair (both orderings)
             pair1 = (interaction.drug_a.lower(), interaction.drug_b.lower())
             pair2 = (interaction.drug_b.lower(), interaction.drug_a.lower())
 
+            # Index by each participating drug (lowercased)
+            for drug in dict.fromkeys(pair1):
+                self.by_drug.setdefault(drug, []).append(interaction)
+
             if pair1 not in self.by_drug_pair:
                 self.by_drug_pair[pair1] = []
             self.by_drug_pair[pair1].append(interaction)
@@ -829,6 +838,36 @@ class InteractionMatrix:
         """Get all interactions of a given severity."""
         return self.by_severity.get(severity.value, [])
 
+    def filter_interactions(
+        self,
+        gene: Optional[str] = None,
+        severity: Optional[InteractionSeverity] = None,
+        drug: Optional[str] = None,
+    ) -> List[DrugDrugInteraction]:
+        """
+        Interactions matching every given filter, in database order.
+
+        Starts from the smallest selected index bucket and checks the
+        remaining filters only against that bucket.
+        """
+        drug_lower = drug.lower() if drug else None
+        buckets = []
+        if gene:
+            buckets.append(self.by_gene.get(gene, []))
+        if severity is not None:
+            buckets.append(self.by_severity.get(severity.value, []))
+        if drug_lower:
+            buckets.append(self.by_drug.get(drug_lower, []))
+        if not buckets:
+            return list(self.interactions)
+
+        return [
+            i for i in min(buckets, key=len)
+            if (not gene or i.gene == gene)
+            and (severity is None or i.severity == severity)
+            and (not drug_lower or drug_lower in (i.drug_a.lower(), i.drug_b.lower()))
+        ]
+
 
 # ============================================================================
 # Convenience Functions
@@ -16,7 +16,7 @@ logger = logging.getLogger(__name__)
 from .models import GenotypeData, DiplotypeResult, VariantCall, IndeterminateReason
 from .cpic_loader import get_cpic_loader
 from .config import get_config, get_confidence_penalties, get_diplotype_config
-from .confidence import ConfidenceBreakdown, ConfidenceCalculator
+from .confidence import ConfidenceBreakdown, ConfidenceCalculator, DiplotypeQuality
 
 # Short code ↔ CPIC long name mapping (bidirectional)
 PHENOTYPE_SHORT_TO_LONG = {
@@ -28,6 +28,12 @@ PHENOTYPE_SHORT_TO_LONG = {
 }
 PHENOTYPE_LONG_TO_SHORT = {v: k for k, v in PHENOTYPE_SHORT_TO_LONG.items()}
 
+# Base complement table for strand-flip rsID translation.
+STRAND_COMPLEMENT = str.maketrans("ACGTacgt", "TGCAtgca")
+
+# First run of digits in a star allele name (*2A -> 2), for tie-breaking
+ALLELE_NUMBER_RE = re.compile(r"\d+")
+
 
 class DiplotypeResolver:
     """Resolves diplotypes from variant calls using star allele calling logic."""
@@ -69,9 +75,6 @@ class DiplotypeResolver:
         if not genotype_data.variants:
             return self._resolve_wildtype(gene, genotype_data, bd)
 
-        # Get variant keys from genotype data
-        variant_keys = genotype_data.get_variant_keys()
-
         # Identify candidate alleles
         candidate_alleles = self._identify_candidate_alleles(gene, genotype_data)
 
@@ -96,14 +99,14 @@ class DiplotypeResolver:
 
         # Only use dip_confidence as a floor if quality_category is not set
         # (legacy path — should not normally trigger)
-        if not quality_category:
+        if quality_category is None:
             bd.diplotype_determinism = min(bd.diplotype_determinism, dip_confidence)
 
         # Map diplotype to phenotype
         phenotype = self._map_phenotype(gene, diplotype)
 
         # Apply allele coverage penalties
-        key_positions = self.loader.get_key_positions(gene)
+        key_positions = self.loader.get_key_position_set(gene)
         has_coverage = bool(genotype_data.covered_positions)
         self.confidence_calc.apply_allele_coverage_penalties(
             bd, gene,
@@ -177,7 +180,7 @@ class DiplotypeResolver:
         """
         from .confidence import CNV_REQUIRED_GENES
 
-        key_positions = set(self.loader.get_key_positions(gene))
+        key_positions = self.loader.get_key_position_set(gene)
         covered_positions = set(genotype_data.covered_positions)
         genome_build = getattr(genotype_data, 'genome_build', None)
 
@@ -278,15 +281,15 @@ class DiplotypeResolver:
             vk = v.variant_key()  # "POS:REF:ALT"
 
             # If no match in variant_to_allele, try rsID-based translation
-            print(f"DEBUG: Checking {vk} (rsid={v.rsid})")
+            logger.debug(f"Checking {vk} (rsid={v.rsid})")
             if vk not in variant_to_allele and v.rsid and v.rsid in rsid_to_cpic_pos:
                 cpic_pos = rsid_to_cpic_pos[v.rsid]
-                print(f"DEBUG: Attempting rsID translation for {v.rsid} (VCF pos {v.pos} -> CPIC {cpic_pos})")
+                logger.debug(f"Attempting rsID translation for {v.rsid} (VCF pos {v.pos} -> CPIC {cpic_pos})")
 
                 # Try direct base match first
                 translated_vk = f"{cpic_pos}:{v.ref}:{v.alt}"
                 if translated_vk in variant_to_allele:
-                    print(f"DEBUG: rsID translation success: {v.rsid} {vk} -> {translated_vk}")
+                    logger.debug(f"rsID translation success: {v.rsid} {vk} -> {translated_vk}")
                     vk = translated_vk
                     # CRITICAL FIX: Update variant object so subsequent checks (is_partial) see the match!
                     parts = translated_vk.split(":")
@@ -296,9 +299,8 @@ class DiplotypeResolver:
                 else:
                     # Try strand-flip combinations:
                     # VCF may report opposite strand or swapped REF/ALT
-                    comp = str.maketrans("ACGTacgt", "TGCAtgca")
-                    comp_ref = v.ref.translate(comp)
-                    comp_alt = v.alt.translate(comp)
+                    comp_ref = v.ref.translate(STRAND_COMPLEMENT)
+                    comp_alt = v.alt.translate(STRAND_COMPLEMENT)
                     candidates = [
                         f"{cpic_pos}:{comp_ref}:{comp_alt}",   # complement
                         f"{cpic_pos}:{comp_alt}:{comp_ref}",   # reverse complement
@@ -306,7 +308,7 @@ class DiplotypeResolver:
                     ]
                     for candidate in candidates:
                         if candidate in variant_to_allele:
-                            print(f"DEBUG: rsID translation (strand) success: {v.rsid} {vk} -> {candidate}")
+                            logger.debug(f"rsID translation (strand) success: {v.rsid} {vk} -> {candidate}")
                             vk = candidate
                             # CRITICAL FIX: Update variant object
                             parts = candidate.split(":")
@@ -316,13 +318,13 @@ class DiplotypeResolver:
                             break
             else:
                  if vk not in variant_to_allele:
-                     print(f"DEBUG: No match for {vk} and rsID fallback failed/not applicable (rsid={v.rsid})")
+                     logger.debug(f"No match for {vk} and rsID fallback failed/not applicable (rsid={v.rsid})")
 
             observed_variants.add(vk)
 
             # Find alleles that contain this variant
             matching_alleles = variant_to_allele.get(vk, [])
-            print(f"DEBUG: {vk} matches alleles: {matching_alleles}")
+            logger.debug(f"{vk} matches alleles: {matching_alleles}")
 
             for allele in matching_alleles:
                 if v.zygosity == "HOM_ALT":
@@ -333,23 +335,24 @@ class DiplotypeResolver:
         # Normalize scores by allele definition size
         normalized_scores = {}
         for allele, score in allele_scores.items():
-            allele_variants = set(self.loader.get_allele_variants(gene, allele))
+            allele_variants = self.loader.get_allele_variant_set(gene, allele)
             if allele_variants:
                 num_variants = len(allele_variants)
 
-                # Check if all defining variants are present
-                all_present = allele_variants.issubset(observed_variants)
+                # Check if all defining variants are present (one set
+                # intersection serves both the subset test and completeness)
+                num_observed = len(allele_variants & observed_variants)
 
-                if all_present:
+                if num_observed == num_variants:
                     # Complete match - normalize by definition size
                     normalized_scores[allele] = score / num_variants
                 else:
                     # Partial match - penalize
-                    completeness = len(allele_variants.intersection(observed_variants)) / num_variants
+                    completeness = num_observed / num_variants
                     base_norm_score = (score / num_variants)
                     normalized_scores[allele] = base_norm_score * completeness * 0.7
         
-        print(f"DEBUG: Candidate alleles for {gene}: {normalized_scores}")
+        logger.debug(f"Candidate alleles for {gene}: {normalized_scores}")
 
         # Hybrid: Include VCF-annotated star alleles alongside positional matches.
         # VCF panels often call star alleles directly (especially for complex genes
@@ -372,7 +375,7 @@ class DiplotypeResolver:
     def _select_best_diplotype(
         self, gene: str, candidate_alleles: Dict[str, float], genotype_data: GenotypeData,
         has_phasing: bool = False
-    ) -> Tuple[str, float, Optional[str], IndeterminateReason, bool, Optional[str]]:
+    ) -> Tuple[str, float, Optional[str], IndeterminateReason, bool, Optional[DiplotypeQuality]]:
         """
         Select the best diplotype from candidate alleles.
         Returns (diplotype, confidence, notes, indeterminate_reason, is_partial_match, quality_category)
@@ -384,7 +387,7 @@ class DiplotypeResolver:
             # No matching alleles found
             if genotype_data.variants:
                 return ("Indeterminate", 0.5, "Variants present but no matching alleles",
-                        IndeterminateReason.NOVEL_VARIANTS, False, "INDETERMINATE")
+                        IndeterminateReason.NOVEL_VARIANTS, False, DiplotypeQuality.INDETERMINATE)
             else:
                 return ("*1/*1", 0.95, "No variants", IndeterminateReason.NONE, False, None)
 
@@ -394,15 +397,10 @@ class DiplotypeResolver:
             allele, score = item
             variant_count = len(self.loader.get_allele_variants(gene, allele))
             
-            # Extract numeric part for sorting
-            import re
-            try:
-                # Extract first number found
-                match = re.search(r'\d+', allele)
-                num = int(match.group()) if match else 9999
-            except:
-                num = 9999
-                
+            # Extract numeric part for sorting (first number found)
+            match = ALLELE_NUMBER_RE.search(allele)
+            num = int(match.group()) if match else 9999
+
             # Tie-breaker: (score DESC, count DESC, -num DESC (meaning num ASC))
             return (score, variant_count, -num, allele) 
 
@@ -412,26 +410,30 @@ class DiplotypeResolver:
         
 
 
-        # Analyze variant zygosity to determine diplotype
-        het_variants = [v for v in genotype_data.variants if v.zygosity == "HET"]
-        hom_variants = [v for v in genotype_data.variants if v.zygosity == "HOM_ALT"]
+        # One pass over the variants for zygosity and observed keys (keys
+        # reflect any rsID translation done in _identify_candidate_alleles)
+        has_het_variant = False
+        observed_variants = set()
+        for v in genotype_data.variants:
+            observed_variants.add(v.variant_key())
+            if v.zygosity == "HET":
+                has_het_variant = True
 
         # Check for partial match (not all defining variants present for top allele)
         top_allele = sorted_candidates[0][0]
-        top_allele_variants = set(self.loader.get_allele_variants(gene, top_allele))
-        observed_variants = set(genotype_data.get_variant_keys())
+        top_allele_variants = self.loader.get_allele_variant_set(gene, top_allele)
         is_partial = not top_allele_variants.issubset(observed_variants)
 
         # Case 1: All variants are homozygous for single allele
         # Relaxed check: Allow if top candidate is strong homozygous match (score ~2.0)
         # even if other partial candidates exist (e.g. *5 vs *15).
         top_score = sorted_candidates[0][1]
-        if not het_variants and (len(sorted_candidates) == 1 or top_score >= 1.9):
+        if not has_het_variant and (len(sorted_candidates) == 1 or top_score >= 1.9):
             allele = sorted_candidates[0][0]
             diplotype = f"{allele}/{allele}"
             confidence = 0.90 if not is_partial else 0.75
             notes = "Homozygous variant allele"
-            qc = "EXACT_HOM" if not is_partial else "PARTIAL"
+            qc = DiplotypeQuality.EXACT_HOM if not is_partial else DiplotypeQuality.PARTIAL
 
             return (diplotype, confidence, notes, IndeterminateReason.NONE, is_partial, qc)
 
@@ -442,13 +444,13 @@ class DiplotypeResolver:
             # --- Hardening: Strict Partial Match Check ---
             if is_partial:
                 return ("Indeterminate", 0.4, f"Partial match to {allele} (incomplete definition)",
-                        IndeterminateReason.PARTIAL_MATCH, True, "PARTIAL")
+                        IndeterminateReason.PARTIAL_MATCH, True, DiplotypeQuality.PARTIAL)
 
             if sorted_candidates[0][1] >= self.diplotype_config.homozygous_score_threshold:
                 diplotype = f"{allele}/{allele}"
                 confidence = 0.90
                 notes = "Likely homozygous"
-                qc = "EXACT_HOM"
+                qc = DiplotypeQuality.EXACT_HOM
             else:
                 # Ensure alphabetic sorting for lookup key consistency (e.g. *1/*2A)
                 other = "*1"
@@ -457,7 +459,7 @@ class DiplotypeResolver:
                 if allele == "*1": diplotype = "*1/*1" # Edge case
                 confidence = 0.85
                 notes = "Heterozygous with wildtype"
-                qc = "EXACT_HET_WILDTYPE"
+                qc = DiplotypeQuality.EXACT_HET_WILDTYPE
 
 
             return (diplotype, confidence, notes, IndeterminateReason.NONE, is_partial, qc)
@@ -480,14 +482,14 @@ class DiplotypeResolver:
                     confidence = 0.85  # High confidence with phasing
                     notes = "Compound heterozygote (phased)"
                     indet = IndeterminateReason.NONE
-                    qc = "COMPOUND_HET_PHASED"
+                    qc = DiplotypeQuality.COMPOUND_HET_PHASED
                 else:
                     # Unphased compound het — capped at 0.80, never boosted
                     base_confidence = min(0.80, (score1 + score2) / 4.0)
                     confidence = base_confidence
                     notes = "Compound heterozygote (unphased — phase uncertainty)"
                     indet = IndeterminateReason.AMBIGUOUS if confidence < 0.6 else IndeterminateReason.NONE
-                    qc = "COMPOUND_HET_UNPHASED"
+                    qc = DiplotypeQuality.COMPOUND_HET_UNPHASED
 
                 # >2 alleles without phasing → Indeterminate
                 if len(sorted_candidates) > 2 and not has_phasing:
@@ -497,7 +499,7 @@ class DiplotypeResolver:
                         confidence = 0.3
                         notes = f">2 candidate alleles ({len(sorted_candidates)}) without phasing"
                         indet = IndeterminateReason.AMBIGUOUS
-                        return (diplotype, confidence, notes, indet, is_partial, "AMBIGUOUS")
+                        return (diplotype, confidence, notes, indet, is_partial, DiplotypeQuality.AMBIGUOUS)
 
 
                 return (diplotype, min(confidence, 0.90), notes, indet, is_partial, qc)
@@ -506,14 +508,14 @@ class DiplotypeResolver:
                 diplotype = f"*1/{allele1}"
                 confidence = 0.75
                 return (diplotype, confidence, "Heterozygous with wildtype",
-                        IndeterminateReason.NONE, is_partial, "EXACT_HET_WILDTYPE")
+                        IndeterminateReason.NONE, is_partial, DiplotypeQuality.EXACT_HET_WILDTYPE)
  
         # Default: heterozygous with wildtype
         allele = sorted_candidates[0][0]
         diplotype = f"*1/{allele}"
         confidence = 0.65
         return (diplotype, confidence, "Default heterozygous call",
-                IndeterminateReason.PARTIAL_MATCH, True, "PARTIAL")
+                IndeterminateReason.PARTIAL_MATCH, True, DiplotypeQuality.PARTIAL)
 
     def _map_phenotype(self, gene: str, diplotype: str) -> str:
         """Map diplotype to phenotype using CPIC phenotype map."""
@@ -15,7 +15,7 @@ No inference allowed.
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Dict, List, Optional, Sequence, Tuple
 
 from .models import VariantCall
@@ -286,7 +286,7 @@ def normalize_variants(
         if new_chrom != v.chrom:
             result.chromosome_normalized += 1
             # Create a new VariantCall with normalised chrom
-            v = v.model_copy(update={"chrom": new_chrom})
+            v = replace(v, chrom=new_chrom)
         normalised.append(v)
 
     # ---- Step 2: Genome build validation ----
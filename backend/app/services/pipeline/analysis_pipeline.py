@@ -1,10 +1,12 @@
 import logging
 import asyncio
+import os
+import threading
 import uuid
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-
-from fastapi import UploadFile
+from typing import Dict, Iterable, List, Optional
 
 from app.schemas.internal_contracts import RiskEngineOutput
 from app.schemas.pharma_schema import (
@@ -15,11 +17,30 @@ from app.schemas.pharma_schema import (
     ClinicalRecommendation,
     QualityMetrics
 )
-from app.services.llm.explanation_service import generate_explanation_background, ULTRA_LIGHTNING_CACHE, generate_explanation
-from app.services.vcf.pharmaguard_adapter import analyze_vcf_for_drugs
+from app.services.llm.explanation_service import generate_explanation_background, register_explanation_job, get_cached_explanation, generate_explanation
+from app.services.vcf.pharmaguard_adapter import SUPPORTED_DRUGS_TO_GENE, analyze_vcf_for_drugs
 
 logger = logging.getLogger(__name__)
 
+# A streaming analysis holds its worker thread until the last upload byte
+# arrives, so slow clients must not drain the shared default executor that
+# asyncio.to_thread callers rely on. They get their own small pool, and
+# requests beyond it are turned away rather than queued.
+MAX_STREAMING_ANALYSES = int(os.environ.get("MAX_STREAMING_ANALYSES", "8"))
+_analysis_executor = ThreadPoolExecutor(
+    max_workers=MAX_STREAMING_ANALYSES, thread_name_prefix="vcf-analysis"
+)
+_analysis_slots = threading.BoundedSemaphore(MAX_STREAMING_ANALYSES)
+
+
+class AnalysisCapacityError(RuntimeError):
+    """Raised when every streaming analysis slot is already in use."""
+
+
+def shutdown_analysis_executor() -> None:
+    """Stop the streaming analysis pool without waiting on stalled uploads."""
+    _analysis_executor.shutdown(wait=False, cancel_futures=True)
+
 
 def compute_heatmap_intensity(severity: str = "low", phenotype: str = "NM") -> int:
     """Computes a 0-4 heatmap intensity score from severity and phenotype."""
@@ -40,10 +61,50 @@ def compute_heatmap_intensity(severity: str = "low", phenotype: str = "NM") -> i
     return intensity
 
 
-async def run_analysis_pipeline(patient_id: str, drug: str, vcf_file: UploadFile) -> PharmaGuardResponse:
+def start_vcf_analysis(drug: str, vcf_lines: Iterable[str]) -> "asyncio.Future[List[Dict]]":
+    """
+    Validate the drug, then start parsing + risk evaluation in a worker thread.
+
+    ``vcf_lines`` may be a blocking iterator that is still being filled
+    (see ``VcfLineQueue``), so the parse runs while the upload streams in.
+    The worker runs on a dedicated pool of ``MAX_STREAMING_ANALYSES`` threads.
+    Raises ValueError straight away for unsupported drugs, and
+    AnalysisCapacityError when every slot is taken.
+    """
+    # Validate drug is supported before processing
+    drug_upper = drug.strip().upper()
+    if drug_upper not in SUPPORTED_DRUGS_TO_GENE:
+        supported = ", ".join(sorted(SUPPORTED_DRUGS_TO_GENE.keys()))
+        raise ValueError(
+            f"'{drug.strip()}' is not currently supported for pharmacogenomic analysis. "
+            f"We will support it soon! Currently supported drugs: {supported}"
+        )
+
+    if not _analysis_slots.acquire(blocking=False):
+        raise AnalysisCapacityError("Too many analyses in progress. Please retry shortly.")
+
+    # CPU-bound parse + risk evaluation; keep it off the event loop. The slot
+    # is freed when the thread finishes, not when the awaiting task is cancelled.
+    try:
+        job = _analysis_executor.submit(analyze_vcf_for_drugs, vcf_lines, (drug_upper,))
+    except BaseException:
+        _analysis_slots.release()
+        raise
+    job.add_done_callback(lambda _: _analysis_slots.release())
+    return asyncio.wrap_future(job)
+
+
+async def run_analysis_pipeline(
+    patient_id: str,
+    drug: str,
+    vcf_lines: Optional[Iterable[str]] = None,
+    *,
+    analysis: "Optional[asyncio.Future[List[Dict]]]" = None,
+) -> PharmaGuardResponse:
     """
     Orchestrates the full pharmacogenomic analysis pipeline:
-    1. Parse VCF via real adapter
+    1. Parse VCF + compute risk via real adapter (or await an ``analysis``
+       already started with ``start_vcf_analysis`` while the upload streamed)
     2. Extract risk from real risk engine
     3. Generate LLM Explanation
     4. Assemble Response
@@ -53,19 +114,11 @@ async def run_analysis_pipeline(patient_id: str, drug: str, vcf_file: UploadFile
 
     # 1. Parse VCF + compute risk via the real adapter
     logger.info("Parsing VCF and computing risk...")
-    vcf_bytes = await vcf_file.read()
+    if analysis is None:
+        analysis = start_vcf_analysis(drug, vcf_lines)
+    results = await analysis
 
-    # Validate drug is supported before processing
-    from app.services.vcf.pharmaguard_adapter import SUPPORTED_DRUGS_TO_GENE
     drug_upper = drug.strip().upper()
-    if drug_upper not in SUPPORTED_DRUGS_TO_GENE:
-        supported = ", ".join(sorted(SUPPORTED_DRUGS_TO_GENE.keys()))
-        raise ValueError(
-            f"'{drug.strip()}' is not currently supported for pharmacogenomic analysis. "
-            f"We will support it soon! Currently supported drugs: {supported}"
-        )
-
-    results = analyze_vcf_for_drugs(vcf_bytes, [drug_upper])
 
     if not results:
         target_gene = SUPPORTED_DRUGS_TO_GENE[drug_upper]
@@ -127,11 +180,12 @@ async def run_analysis_pipeline(patient_id: str, drug: str, vcf_file: UploadFile
 
     cache_key = f"{gene}:{diplotype}:{drug}".lower()
 
-    if cache_key in ULTRA_LIGHTNING_CACHE:
-        explanation_text = ULTRA_LIGHTNING_CACHE[cache_key]
+    explanation_text = get_cached_explanation(cache_key)
+    if explanation_text is not None:
         job_id = None
     else:
         job_id = str(uuid.uuid4())
+        register_explanation_job(job_id)
         asyncio.create_task(generate_explanation_background(job_id, risk_data, drug))
         explanation_text = f"Generating clinical explanation... job_id:{job_id}"
 
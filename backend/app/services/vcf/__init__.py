@@ -1,6 +1,6 @@
 from .parser import VcfHeaderInfo, VcfParseResult, VcfVariant, iter_vcf_variants, parse_vcf, read_vcf_header
 from .variant_extractor import extract_pharmacogenes
-from .pharmaguard_adapter import analyze_vcf_for_drugs
+from .stream import VcfLineDecoder, iter_vcf_lines
 
 __all__ = [
     "VcfParseResult",
@@ -9,7 +9,18 @@ __all__ = [
     "VcfHeaderInfo",
     "read_vcf_header",
     "iter_vcf_variants",
+    "VcfLineDecoder",
+    "iter_vcf_lines",
     "extract_pharmacogenes",
+    # Resolved lazily by __getattr__ below, so it is listed here by name only
     "analyze_vcf_for_drugs",
 ]
 
+
+def __getattr__(name):
+    # The adapter pulls in the CPIC loader and risk engine; only import it
+    # when actually asked for so parser/stream users stay lightweight.
+    if name == "analyze_vcf_for_drugs":
+        from .pharmaguard_adapter import analyze_vcf_for_drugs
+        return analyze_vcf_for_drugs
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
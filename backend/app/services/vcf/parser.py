@@ -96,6 +96,10 @@ def parse_vcf(
     )
 
 
+_FILEFORMAT_KEY = "##fileformat="
+_FILEFORMAT_KEY_LEN = len(_FILEFORMAT_KEY)
+
+
 def read_vcf_header(lines: Iterable[str]) -> Tuple[VcfHeaderInfo, Iterator[str]]:
     """
     Consume an iterable of VCF lines until the first variant record.
@@ -116,7 +120,8 @@ def read_vcf_header(lines: Iterable[str]) -> Tuple[VcfHeaderInfo, Iterator[str]]
             continue
         if line.startswith("##"):
             header_lines.append(line)
-            if line.lower().startswith("##fileformat="):
+            # Only the key is case-folded, not the whole (possibly long) meta line
+            if line[:_FILEFORMAT_KEY_LEN].lower() == _FILEFORMAT_KEY:
                 vcf_version = line.split("=", 1)[1].strip()
             continue
         if line.startswith("#"):
@@ -192,6 +197,12 @@ def _normalize_to_lines(content: Union[str, bytes, Iterable[str], Path]) -> Iter
                 yield from f
         return
     if isinstance(content, bytes):
+        # Gzip payloads are recognised by magic, never decoded as text.
+        if content[:2] == b"\x1f\x8b":
+            try:
+                content = gzip.decompress(content)
+            except (OSError, EOFError) as e:
+                raise VcfParseError(f"Invalid gzip data in VCF: {e}") from e
         # VCFs are typically UTF-8/ASCII; ignore odd bytes instead of failing hard.
         text = content.decode("utf-8", errors="replace")
         yield from text.splitlines(True)
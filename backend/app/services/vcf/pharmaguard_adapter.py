@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import datetime as _dt
 import logging
-from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
 
 from .parser import VcfParseResult, parse_vcf
 from .variant_extractor import ExtractedVariant, extract_pharmacogenes
@@ -102,11 +102,13 @@ def _now_iso() -> str:
 # ---------------------------------------------------------------------------
 
 def analyze_vcf_for_drugs(
-    file_bytes: bytes,
+    file_bytes: Union[bytes, Iterable[str]],
     drugs: Iterable[str],
 ) -> List[Dict]:
     """
-    Parse VCF bytes and produce a CPIC-informed risk report per drug.
+    Parse VCF content (raw bytes, or decoded lines — possibly a lazy iterator
+    such as ``iter_vcf_lines`` over an upload) and produce a CPIC-informed
+    risk report per drug.
 
     Returns a list of dicts (one per drug) containing:
       patient_id, drug, timestamp, risk_assessment,
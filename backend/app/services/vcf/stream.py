@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import codecs
+import queue
+import zlib
+from typing import BinaryIO, Iterator, List, Optional
+
+from .parser import VcfParseError
+
+
+VCF_FILEFORMAT_PREFIX = "##fileformat=VCF"
+GZIP_MAGIC = b"\x1f\x8b"
+READ_CHUNK_SIZE = 64 * 1024
+# Line batches (roughly one network chunk each) buffered ahead of the parser.
+MAX_QUEUED_BATCHES = 16
+
+
+class VcfLineDecoder:
+    """
+    Incrementally turn uploaded VCF byte chunks into text lines.
+
+    Chunks are fed as they arrive off the wire, so the upload never has to be
+    held in memory as a single ``bytes`` object and then decoded again.
+    Gzip payloads are inflated chunk-by-chunk, overlapping decompression with
+    the upload. The ``##fileformat=VCF`` header is checked as soon as the first
+    line is complete, so non-VCF uploads are rejected without reading the rest.
+    """
+
+    def __init__(self, *, gzipped: bool = False) -> None:
+        # 16 + MAX_WBITS → expect a gzip wrapper (RFC 1952).
+        self._inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+        # Raw head bytes held back until the gzip magic can be checked.
+        self._magic_head: Optional[bytes] = b"" if gzipped else None
+        # VCFs are typically UTF-8/ASCII; replace odd bytes instead of failing hard.
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = ""
+        self._header_checked = False
+        self.lines: List[str] = []
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume one raw chunk of the upload."""
+        if not chunk:
+            return
+        if self._magic_head is not None:
+            chunk = self._sniff_gzip_magic(chunk)
+            if not chunk:
+                return
+        if self._inflater is not None:
+            try:
+                chunk = self._inflater.decompress(chunk)
+            except zlib.error as e:
+                raise VcfParseError(f"Invalid gzip data in VCF upload: {e}") from e
+        self._push_text(self._decoder.decode(chunk))
+
+    def pop_lines(self) -> List[str]:
+        """Return the lines completed so far and drop them from the decoder."""
+        lines, self.lines = self.lines, []
+        return lines
+
+    def close(self) -> List[str]:
+        """Flush buffered bytes and return every decoded line."""
+        if self._magic_head:
+            raise VcfParseError("Invalid .vcf.gz upload: file is not gzip-compressed.")
+        tail: Optional[bytes] = None
+        if self._inflater is not None:
+            try:
+                tail = self._inflater.flush()
+            except zlib.error as e:
+                raise VcfParseError(f"Invalid gzip data in VCF upload: {e}") from e
+            if not self._inflater.eof:
+                raise VcfParseError("Invalid gzip data in VCF upload: stream is truncated.")
+        self._push_text(self._decoder.decode(tail or b"", final=True))
+        if self._pending:
+            self._append(self._pending)
+            self._pending = ""
+        if not self._header_checked:
+            raise VcfParseError("Invalid VCF: file is empty.")
+        return self.lines
+
+    def _sniff_gzip_magic(self, chunk: bytes) -> bytes:
+        """
+        Check the gzip magic on the raw head before inflating anything.
+
+        The sniffed bytes are handed straight back to ``feed`` so nothing is
+        read twice.
+        """
+        head = self._magic_head + chunk
+        if len(head) < len(GZIP_MAGIC):
+            self._magic_head = head
+            return b""
+        if not head.startswith(GZIP_MAGIC):
+            raise VcfParseError("Invalid .vcf.gz upload: file is not gzip-compressed.")
+        self._magic_head = None
+        return head
+
+    def _push_text(self, text: str) -> None:
+        if not text:
+            return
+        parts = (self._pending + text).splitlines(True)
+        # The last piece is incomplete unless it ends in a newline.
+        if parts and not parts[-1].endswith(("\n", "\r")):
+            self._pending = parts.pop()
+        else:
+            self._pending = ""
+        for line in parts:
+            self._append(line)
+
+    def _append(self, line: str) -> None:
+        if not self._header_checked:
+            if not line.startswith(VCF_FILEFORMAT_PREFIX):
+                raise VcfParseError(
+                    "Invalid VCF: file must start with a '##fileformat=VCF' header line."
+                )
+            self._header_checked = True
+        self.lines.append(line)
+
+
+# Queue markers: upload finished / upload abandoned
+_END_OF_UPLOAD = object()
+_UPLOAD_ABORTED = object()
+
+
+class VcfLineQueue:
+    """
+    Hand decoded VCF lines from the upload (event loop) to the parser
+    (worker thread).
+
+    The producer awaits ``put`` with each batch from ``VcfLineDecoder.pop_lines``
+    as the upload arrives; iterating blocks in the worker thread until the next
+    batch is queued, so parsing overlaps ingestion. At most ``maxsize`` batches
+    are held: once the parser falls behind, ``put`` waits for it, which stops
+    reading from the socket and pushes back on the client.
+    Must be created on the event loop that feeds it.
+    """
+
+    def __init__(self, maxsize: int = MAX_QUEUED_BATCHES) -> None:
+        self._batches: "queue.Queue[object]" = queue.Queue(maxsize)
+        self._loop = asyncio.get_running_loop()
+        self._space = asyncio.Event()
+        self._aborted = False
+        self._detached = False
+
+    async def put(self, lines: List[str]) -> None:
+        """Queue a batch of decoded lines (empty batches are dropped)."""
+        if lines:
+            await self._put(lines)
+
+    async def close(self) -> None:
+        """Mark the upload complete; iteration ends after the queued lines."""
+        await self._put(_END_OF_UPLOAD)
+
+    def abort(self) -> None:
+        """Unblock the consumer when the upload is abandoned."""
+        self._aborted = True
+        try:
+            self._batches.put_nowait(_UPLOAD_ABORTED)
+        except queue.Full:
+            pass  # consumer is not waiting; it sees the flag on its next get
+
+    def detach(self) -> None:
+        """The consumer has stopped; release producers waiting for space."""
+        self._detached = True
+        self._space.set()
+
+    async def _put(self, item: object) -> None:
+        while not self._detached:
+            self._space.clear()
+            try:
+                self._batches.put_nowait(item)
+                return
+            except queue.Full:
+                await self._space.wait()
+
+    def __iter__(self) -> Iterator[str]:
+        get = self._batches.get
+        notify_space = self._space.set
+        call_soon_threadsafe = self._loop.call_soon_threadsafe
+        while True:
+            batch = get()
+            call_soon_threadsafe(notify_space)
+            if self._aborted or batch is _UPLOAD_ABORTED:
+                raise VcfParseError("VCF upload was interrupted.")
+            if batch is _END_OF_UPLOAD:
+                return
+            yield from batch
+
+
+def iter_vcf_lines(
+    fileobj: BinaryIO, *, gzipped: bool = False, chunk_size: int = READ_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Lazily yield decoded VCF lines from a binary file object.
+
+    Only one chunk plus the lines decoded from it are resident at a time, so a
+    parser consuming this iterator never needs the whole upload in memory.
+    The same gzip-magic and ``##fileformat=VCF`` checks as ``VcfLineDecoder``
+    apply, raised when the offending chunk is reached.
+    """
+    decoder = VcfLineDecoder(gzipped=gzipped)
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        decoder.feed(chunk)
+        yield from decoder.pop_lines()
+    yield from decoder.close()
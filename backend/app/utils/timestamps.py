@@ -0,0 +1,20 @@
+"""
+Timestamp helpers for response payloads.
+
+Report timestamps only need second resolution, so the ISO string is built
+once per wall-clock second and reused by every request in that second.
+"""
+
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def _utc_iso_for_second(epoch_second: int) -> str:
+    return datetime.fromtimestamp(epoch_second, tz=timezone.utc).isoformat()
+
+
+def utc_now_iso() -> str:
+    """Current UTC time as an ISO 8601 string (second resolution, cached)."""
+    return _utc_iso_for_second(int(time.time()))
@@ -39,23 +39,31 @@ export default function ResultCard({ data, jobId }) {
 
   const heatmap = HEATMAP_STYLES[intensity] || HEATMAP_STYLES[0]
 
-  // Poll for explanation when jobId is present
+  // Long-poll for explanation when jobId is present (the server holds each
+  // request until the explanation is ready or its wait times out)
   useEffect(() => {
     if (!jobId) return
 
-    const interval = setInterval(async () => {
-      try {
-        const summary = await fetchExplanation(jobId)
-        if (summary) {
-          setExplanation(summary)
-          clearInterval(interval)
+    let cancelled = false
+
+    const poll = async () => {
+      while (!cancelled) {
+        try {
+          const summary = await fetchExplanation(jobId)
+          if (summary) {
+            if (!cancelled) setExplanation(summary)
+            return
+          }
+        } catch (err) {
+          // Silently retry
         }
-      } catch (err) {
-        // Silently retry
+        // Short pause before re-polling so an unknown job can't spin
+        await new Promise((resolve) => setTimeout(resolve, 1500))
       }
-    }, 1500)
+    }
+    poll()
 
-    return () => clearInterval(interval)
+    return () => { cancelled = true }
   }, [jobId])
 
   // Use polled explanation if available, otherwise use initial data